@@ -0,0 +1,163 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from irproject.backend.Simulation import Simulation
+from irproject.backend.StageCache import StageCache
+from irproject.models.Blackbody import Blackbody
+from irproject.models.Optics import Optics
+from irproject.models.Bolometers import Bolometers
+from irproject.models.Readout import Readout
+from irproject.models.ADC import ADC
+from irproject.models.NUC import NUC
+from irproject.models.FusedOutput import FusedOutput
+from irproject.models import params
+
+# Run from the repository root with python -m benchmarks.benchmark, or with the package installed
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+RESOLUTIONS = [(80, 60), (320, 240), (640, 480), (1280, 1024)]
+SWEEPS = [1, 4, 16]
+
+
+def build_models(resolution):
+    """ Models of the main.py chain at the given resolution, NUC with unit gain """
+    focal_length = resolution[0] * params.pitch / (2 * np.arctan(np.pi / 12))
+    adc = ADC(size_active=resolution, skim='h')
+    nuc = NUC(np.ones((resolution[1], resolution[0])), np.zeros((resolution[1], resolution[0])),
+              resolution=resolution)
+    return {
+        "Blackbody": Blackbody(),
+        "Optics": Optics(resolution=resolution, focal_length=focal_length),
+        "Bolometers": Bolometers(size_active=resolution),
+        "Readout": Readout(size_active=resolution),
+        "ADC": adc,
+        "NUC": nuc,
+        "FusedOutput": FusedOutput(adc, nuc),
+    }
+
+
+def measure(function, repeat):
+    """ Best and mean wall time over repeat calls, peak traced memory of one more call """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return min(times), sum(times) / len(times), peak
+
+
+def record(stage, resolution, sweep, repeat, function):
+    best, mean, peak = measure(function, repeat)
+    pixels = resolution[0] * resolution[1] * sweep
+    return {
+        "stage": stage,
+        "resolution": list(resolution),
+        "sweep": sweep,
+        "time_best": best,
+        "time_mean": mean,
+        "peak_bytes": peak,
+        "pixels_per_s": pixels / best,
+    }
+
+
+def bench_stages(resolution, repeat):
+    """ Every model alone on the output of the upstream models """
+    models = build_models(resolution)
+    chain = ["Blackbody", "Optics", "Bolometers", "Readout", "ADC", "NUC"]
+    inputs = {}
+    data = None
+    for name in chain:
+        inputs[name] = data
+        data = models[name].process(data, None)
+    inputs["FusedOutput"] = inputs["ADC"]
+
+    results = []
+    for name in chain + ["FusedOutput"]:
+        model = models[name]
+        results.append(record(name, resolution, 1, repeat, lambda: model.process(inputs[name], None)))
+    return results
+
+
+def bench_simulation(resolution, sweep, repeat):
+    """ Whole chain with a sweep over scene temperatures, cache is emptied before every run """
+    models = build_models(resolution)
+    models["Blackbody"].set_args_list(list(np.linspace(300, 400, sweep)))
+    simulation = Simulation([models[name] for name in ["Blackbody", "Optics", "Bolometers", "Readout", "ADC", "NUC"]],
+                            StageCache())
+
+    def run():
+        simulation.cache.clear()
+        for _ in simulation.stream():
+            pass
+
+    return record("Simulation", resolution, sweep, repeat, run)
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=root, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline):
+    """ Print speedup of every entry present in both result files """
+    key = lambda entry: (entry["stage"], tuple(entry["resolution"]), entry["sweep"])
+    reference = {key(entry): entry for entry in baseline["results"]}
+    for entry in results["results"]:
+        if key(entry) in reference:
+            old = reference[key(entry)]
+            print("%-12s %5dx%-5d sweep %3d  speedup %6.2fx  memory %6.2fx" % (
+                entry["stage"], entry["resolution"][0], entry["resolution"][1], entry["sweep"],
+                old["time_best"] / entry["time_best"], entry["peak_bytes"] / max(old["peak_bytes"], 1)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-stage and end-to-end benchmarks of the simulation")
+    parser.add_argument("--resolutions", nargs="+", default=["%dx%d" % r for r in RESOLUTIONS],
+                        help="Active resolutions as HxV")
+    parser.add_argument("--sweeps", nargs="+", type=int, default=SWEEPS, help="Sweep sizes of the end-to-end run")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed calls per measurement")
+    parser.add_argument("--output", default="benchmark.json", help="JSON results file")
+    parser.add_argument("--compare", help="JSON results file of a previous run to compare with")
+    options = parser.parse_args()
+
+    results = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.platform(),
+        "dtype": params.dtype,
+        "results": [],
+    }
+    for text in options.resolutions:
+        resolution = tuple(int(value) for value in text.split("x"))
+        print("Resolution " + text, file=sys.stderr)
+        results["results"] += bench_stages(resolution, options.repeat)
+        for sweep in options.sweeps:
+            results["results"].append(bench_simulation(resolution, sweep, options.repeat))
+
+    with open(options.output, "w") as file:
+        json.dump(results, file, indent=2)
+
+    if options.compare:
+        with open(options.compare) as file:
+            compare(results, json.load(file))
+
+
+if __name__ == '__main__':
+    main()
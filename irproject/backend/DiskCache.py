@@ -0,0 +1,148 @@
+import hashlib
+import inspect
+import os
+import shutil
+import tempfile
+from functools import lru_cache
+
+import numpy as np
+
+from irproject.backend.StageCache import StageCache, freeze
+
+
+# Packages holding the models and the code they share, all their modules are hashed
+_PACKAGES = ("backend", "models")
+
+
+@lru_cache(maxsize=None)
+def _project_digest():
+    """ Hash of all modules of the project packages, a model depends on helper modules (Radiance)
+        and on shared code (Model) besides its own module """
+    digest = hashlib.sha1()
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    for package in _PACKAGES:
+        directory = os.path.join(root, package)
+        for name in sorted(os.listdir(directory)):
+            if name.endswith(".py"):
+                digest.update(name.encode())
+                with open(os.path.join(directory, name), "rb") as file:
+                    digest.update(file.read())
+    return digest.hexdigest()
+
+
+@lru_cache(maxsize=None)
+def _source_digest(cls):
+    """ Hash of the project code and of the module of the model class, which may be outside of the
+        project, outputs are invalidated when the code changes """
+    try:
+        with open(inspect.getsourcefile(cls), "rb") as file:
+            return hashlib.sha1(_project_digest().encode() + file.read()).hexdigest()
+    except (OSError, TypeError):
+        return None
+
+
+def describe(value):
+    """ Description of a model configuration stable across runs, public attributes of objects
+        are described recursively and arrays by the hash of their content """
+    if isinstance(value, np.ndarray):
+        return freeze(value)
+    if isinstance(value, dict):
+        return tuple(sorted((str(key), describe(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(describe(item) for item in value)
+    if hasattr(value, "__dict__") and not inspect.isroutine(value) and not isinstance(value, type):
+        attributes = {name: item for name, item in vars(value).items()
+                      if not name.startswith("_") and name not in ("args_list", "outputs")}
+        return type(value).__name__, _source_digest(type(value)), describe(attributes)
+    return repr(value)
+
+
+class DiskCache(StageCache):
+    """ Stage outputs stored on disk in path, shared by runs and processes using the same path.
+
+        Keys are content addressed: a hash of the model configuration (public attributes, source
+        of the model module and of all modules of the backend and models packages), its args and
+        the upstream key, so a stage is reused as long as nothing upstream has changed. Models must
+        not be modified after their first use. Every output is a directory of .npy files loaded
+        memory-mapped, least recently used outputs are removed when the directory grows over
+        max_disk_bytes. Outputs are also kept in memory up to max_bytes like in StageCache """
+    def __init__(self, path, max_disk_bytes=2 ** 34, max_bytes=2 ** 30):
+        super().__init__(max_bytes)
+        self.path = path
+        self.max_disk_bytes = max_disk_bytes
+        self.digests = {}
+        os.makedirs(path, exist_ok=True)
+
+    def empty(self):
+        return DiskCache(self.path, self.max_disk_bytes, self.max_bytes)
+
+    def key(self, model, args, upstream_key):
+        if model not in self.digests:
+            try:
+                self.digests[model] = hashlib.sha1(repr(describe(model)).encode()).hexdigest()
+            except TypeError:
+                self.digests[model] = None
+        try:
+            args = freeze(args)
+        except TypeError:
+            return None
+        if self.digests[model] is None:
+            return None
+        outputs = None if model.outputs is None else tuple(sorted(model.outputs))
+        return hashlib.sha1(repr((self.digests[model], outputs, args, upstream_key)).encode()).hexdigest()
+
+    def get(self, key):
+        output_data = None if key is None else self.entries.get(key, (None,))[0]
+        if output_data is not None or key is None:
+            return super().get(key)
+
+        directory = os.path.join(self.path, key)
+        try:
+            output_data = {os.path.splitext(name)[0]: np.load(os.path.join(directory, name), mmap_mode="r")
+                           for name in os.listdir(directory)}
+            os.utime(directory)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        super().put(key, output_data)
+        return output_data
+
+    def put(self, key, output_data, keep=True):
+        super().put(key, output_data, keep)
+        if key is None or output_data is None or os.path.isdir(os.path.join(self.path, key)):
+            return
+
+        '''Written into a temporary directory and renamed, readers never see a partial output'''
+        temporary = tempfile.mkdtemp(dir=self.path, prefix=".tmp")
+        try:
+            for name, value in output_data.items():
+                np.save(os.path.join(temporary, name + ".npy"), np.asarray(value))
+            os.rename(temporary, os.path.join(self.path, key))
+        except OSError:
+            shutil.rmtree(temporary, ignore_errors=True)
+            return
+        self._evict()
+
+    def _evict(self):
+        outputs = []
+        total = 0
+        for entry in os.scandir(self.path):
+            if entry.is_dir() and not entry.name.startswith("."):
+                size = sum(item.stat().st_size for item in os.scandir(entry.path))
+                outputs.append((entry.stat().st_mtime, size, entry.path))
+                total += size
+
+        for _, size, directory in sorted(outputs):
+            if total <= self.max_disk_bytes:
+                break
+            shutil.rmtree(directory, ignore_errors=True)
+            total -= size
+
+    def clear(self):
+        """ Remove outputs from memory and disk """
+        super().clear()
+        for entry in os.scandir(self.path):
+            if entry.is_dir():
+                shutil.rmtree(entry.path, ignore_errors=True)
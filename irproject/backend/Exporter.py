@@ -0,0 +1,146 @@
+import os
+import queue
+import threading
+import zipfile
+
+import numpy as np
+
+from irproject.backend.SweepResult import SweepResult
+
+# Length of the .npy header of a growing stack, room for any frame count
+_NPY_HEADER = 256
+
+
+class Exporter:
+    def __init__(self, path, key="ADC", chunk_frames=64, queue_size=8):
+        """ Write frames from a background thread as they are produced, the format follows the extension:
+
+            .npy        - one (N, H, W) stack, the header is updated after every frame so the file can
+                          be opened with np.load(path, mmap_mode='r') while it grows
+            .npz        - compressed chunks of chunk_frames frames, arrays chunk_00000, chunk_00001, ...
+            .png, .tif  - one 16-bit image per frame, path_00000.png, ... (requires opencv)
+
+            Values are written unchanged, ADC codes are not normalized. Images hold integer codes,
+            rounded and clipped to uint16. At most queue_size frames wait for the writer, write blocks
+            when the writer falls behind """
+        self.path = path
+        self.key = key
+        self.chunk_frames = chunk_frames
+        self.extension = os.path.splitext(path)[1].lower()
+        if self.extension not in (".npy", ".npz", ".png", ".tif", ".tiff"):
+            raise ValueError("Unsupported export format: " + self.extension)
+
+        self.count = 0
+        self.error = None
+        self._ended = False
+        self.queue = queue.Queue(queue_size)
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def write(self, frame):
+        """ Queue a frame, an array or a stage output dict. Writeable arrays are copied since stages
+            may reuse their buffers """
+        if self.error is not None:
+            raise self.error
+        if isinstance(frame, dict):
+            frame = frame[self.key]
+        frame = np.asarray(frame)
+        if frame.flags.writeable:
+            frame = frame.copy()
+        self.queue.put(frame)
+        self.count += 1
+
+    def export(self, outputs):
+        """ Write outputs of Simulation.stream() or frames of a SweepResult and close, returns the
+            number of frames """
+        frames = outputs[self.key] if isinstance(outputs, SweepResult) else (output for _, output in outputs)
+        with self:
+            for frame in frames:
+                self.write(frame)
+        return self.count
+
+    def close(self):
+        """ Wait until all queued frames are written """
+        if self.thread.is_alive():
+            self.queue.put(None)
+            self.thread.join()
+        if self.error is not None:
+            raise self.error
+
+    def _run(self):
+        try:
+            if self.extension == ".npy":
+                self._write_npy()
+            elif self.extension == ".npz":
+                self._write_npz()
+            else:
+                self._write_images()
+        except Exception as error:
+            self.error = error
+            '''Drain the queue so that write does not block, unless the error comes after the end of
+               the frames (writing the last chunk, closing the file) and nothing is left to drain'''
+            while not self._ended and self.queue.get() is not None:
+                pass
+
+    def _frames(self):
+        while True:
+            frame = self.queue.get()
+            if frame is None:
+                self._ended = True
+                return
+            yield frame
+
+    def _write_npy(self):
+        with open(self.path, "wb") as file:
+            count = 0
+            for frame in self._frames():
+                if count == 0:
+                    dtype, shape = frame.dtype, frame.shape
+                    file.write(self._npy_header(dtype, (0,) + shape))
+                elif frame.shape != shape or frame.dtype != dtype:
+                    raise ValueError("Frames of a .npy stack must have the same shape and dtype")
+
+                file.write(np.ascontiguousarray(frame).tobytes())
+                count += 1
+                file.seek(0)
+                file.write(self._npy_header(dtype, (count,) + shape))
+                file.seek(0, os.SEEK_END)
+                file.flush()
+
+    @staticmethod
+    def _npy_header(dtype, shape):
+        """ Version 1.0 header padded to a fixed length, so that it can be rewritten in place """
+        header = repr({"descr": np.lib.format.dtype_to_descr(dtype), "fortran_order": False, "shape": shape})
+        header = header.ljust(_NPY_HEADER - 10 - 1) + "\n"
+        return np.lib.format.magic(1, 0) + np.uint16(len(header)).astype("<u2").tobytes() + header.encode("latin1")
+
+    def _write_npz(self):
+        with zipfile.ZipFile(self.path, "w", zipfile.ZIP_DEFLATED) as archive:
+            chunk = []
+            for frame in self._frames():
+                chunk.append(frame)
+                if len(chunk) == self.chunk_frames:
+                    self._write_chunk(archive, chunk)
+                    chunk = []
+            if chunk:
+                self._write_chunk(archive, chunk)
+
+    def _write_chunk(self, archive, chunk):
+        name = "chunk_%05d.npy" % len(archive.namelist())
+        with archive.open(name, "w", force_zip64=True) as file:
+            np.lib.format.write_array(file, np.stack(chunk))
+
+    def _write_images(self):
+        import cv2
+
+        stem = os.path.splitext(self.path)[0]
+        for index, frame in enumerate(self._frames()):
+            image = np.clip(np.round(frame), 0, np.iinfo(np.uint16).max).astype(np.uint16)
+            if not cv2.imwrite(stem + "_%05d" % index + self.extension, image):
+                raise IOError("Cannot write " + stem + "_%05d" % index + self.extension)
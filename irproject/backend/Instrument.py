@@ -0,0 +1,80 @@
+import sys
+import threading
+import time
+
+from irproject.backend.StageCache import StageCache
+
+
+class Instrument:
+    """ Receives events of a Simulation, methods do nothing and subclasses override the ones they
+        need. Stages of tiled models are reported once per band of rows, from several threads when
+        tile_workers > 1. With workers > 1 stages run in worker processes and only progress is reported """
+    def stage_start(self, model, rows):
+        pass
+
+    def stage_stop(self, model, rows, elapsed, input_data, output_data, cached):
+        pass
+
+    def progress(self, done, total):
+        pass
+
+
+class Instruments(Instrument):
+    """ Forward events to several instruments """
+    def __init__(self, *instruments):
+        self.instruments = instruments
+
+    def stage_start(self, model, rows):
+        for instrument in self.instruments:
+            instrument.stage_start(model, rows)
+
+    def stage_stop(self, model, rows, elapsed, input_data, output_data, cached):
+        for instrument in self.instruments:
+            instrument.stage_stop(model, rows, elapsed, input_data, output_data, cached)
+
+    def progress(self, done, total):
+        for instrument in self.instruments:
+            instrument.progress(done, total)
+
+
+class StageTimer(Instrument):
+    """ Calls, time, cache hits and bytes of input and output arrays accumulated per model """
+    def __init__(self):
+        self.stages = {}
+        self.lock = threading.Lock()
+
+    def stage_stop(self, model, rows, elapsed, input_data, output_data, cached):
+        bytes_in = 0 if input_data is None else StageCache.nbytes(input_data)
+        bytes_out = StageCache.nbytes(output_data)
+        with self.lock:
+            stage = self.stages.setdefault(model, {"name": type(model).__name__, "calls": 0, "hits": 0,
+                                                   "time": 0.0, "bytes_in": 0, "bytes_out": 0})
+            stage["calls"] += 1
+            stage["hits"] += cached
+            stage["time"] += elapsed
+            stage["bytes_in"] += bytes_in
+            stage["bytes_out"] += bytes_out
+
+    def report(self):
+        """ Statistics of every model in order of first execution, with the cache hit rate """
+        return [dict(stage, hit_rate=stage["hits"] / stage["calls"]) for stage in self.stages.values()]
+
+
+class Progress(Instrument):
+    """ Call callback(done, total) with the number of finished branches at most once per interval
+        seconds, and once all branches are finished. Prints to stderr by default """
+    def __init__(self, callback=None, interval=1.0):
+        self.callback = callback if callback is not None else self.print
+        self.interval = interval
+        self.last = None
+
+    @staticmethod
+    def print(done, total):
+        sys.stderr.write("\rBranch %d/%d" % (done, total) + ("\n" if done == total else ""))
+        sys.stderr.flush()
+
+    def progress(self, done, total):
+        now = time.monotonic()
+        if done == total or self.last is None or now - self.last >= self.interval:
+            self.last = now
+            self.callback(done, total)
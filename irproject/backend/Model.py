@@ -0,0 +1,43 @@
+
+class Model:
+    def __init__(self, input_tuple=None, output_tuple=None, args_list=None):
+        if args_list is None:
+            args_list = [None]
+        self.input_tuple = input_tuple
+        self.output_tuple = output_tuple
+        self.args_list = args_list
+        # Name of the swept parameter in SweepResult when args are not dicts
+        self.args_name = None
+        # Output of a stateful model depends on previous calls, it is never cached or run in parallel
+        self.stateful = False
+        # Output of the model can be reused by branches sharing its arguments and upstream stages
+        self.cacheable = True
+        # Model can process the frame by bands of rows, see process_rows
+        self.tileable = False
+        # Output keys consumed downstream, set by Simulation.compile, None for all of them
+        self.outputs = None
+
+    def set_args_list(self, args_list):
+        self.args_list = args_list
+
+    def process(self, input_data=None, args=None):
+        raise NotImplementedError()
+
+    def required_inputs(self, outputs):
+        """ Input keys needed to produce the given output keys """
+        return set(self.input_tuple) if self.input_tuple else set()
+
+    def fuse(self, model, reuse_buffers=False):
+        """ Model doing the work of this model followed by model in one pass, None if they cannot be fused.
+            With reuse_buffers the fused stage may return buffers overwritten by the next frame """
+        return None
+
+    def input_rows(self, rows):
+        """ Rows of the input frame needed to produce the given rows of the output frame """
+        return rows
+
+    def process_rows(self, input_data, args, rows):
+        """ Produce only the given rows (index array) of the output frame. input_data holds the
+            input_rows(rows) rows of the input frame, or the whole input for the first tiled model.
+            Models setting tileable implement it """
+        raise NotImplementedError()
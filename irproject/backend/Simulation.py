@@ -0,0 +1,263 @@
+import itertools
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+
+from irproject.backend.StageCache import StageCache
+from irproject.backend.SweepResult import SweepResult
+
+# Memory limit of the cache of a simulation not given one. Branches of a run share upstream stages
+# without the cache, it only serves repeated runs of the same simulation
+_DEFAULT_CACHE_BYTES = 2 ** 26
+
+# Simulation of the worker process, stages are shared by branches executed by the same worker
+_worker_simulation = None
+
+
+def _init_worker(stages, outputs, cache, tile_rows, tile_workers):
+    '''Plan compiled by the parent is reused as it is, outputs pruned by compile(outputs) included'''
+    global _worker_simulation
+    _worker_simulation = Simulation(stages, cache, tile_rows=tile_rows, tile_workers=tile_workers)
+    _worker_simulation.stages = stages
+    _worker_simulation.outputs = outputs
+
+
+def _run_branches(combinations):
+    return [_worker_simulation.run_branch(combination) for combination in combinations]
+
+
+class Simulation:
+    def __init__(self, models, cache=None, workers=1, tile_rows=None, tile_workers=1, instrument=None):
+        """ Stage outputs are memoized in cache, pass the same StageCache to several simulations
+            to share stages between them, or a DiskCache to reuse them across runs. Final outputs are
+            not kept in memory (a DiskCache still stores them), so memory of a streamed sweep is
+            bounded by the cache size, a small one by default. With workers > 1
+            branches of the sweep are executed by a pool of processes.
+
+            With tile_rows set, trailing tileable models (see Model.process_rows) process the frame
+            by bands of tile_rows output rows, tile_workers bands at a time in threads. Only the
+            final output is assembled into a full frame, outputs of tiled models are not cached.
+
+            Stage timing, cache hits and progress are reported to instrument (see Instrument), the
+            simulation is silent without it """
+        self.models = models
+        self.cache = cache if cache is not None else StageCache(_DEFAULT_CACHE_BYTES)
+        self.workers = workers
+        self.tile_rows = tile_rows
+        self.tile_workers = tile_workers
+        self.instrument = instrument
+        self.stages = None
+        self.outputs = None
+
+    def is_compatible(self, input_model, output_model):
+        for key in output_model.input_tuple:
+
+            if key not in input_model.output_tuple:
+                print("ERROR: Type mismatch for '"
+                      + type(input_model).__name__ + "' and '"
+                      + type(output_model).__name__ + "' key '"
+                      + key + "' is not found")
+                return False
+
+            if input_model.output_tuple[key] != output_model.input_tuple[key]:
+                print("ERROR: Shape or dtype mismatch for '"
+                      + key + "' key in '"
+                      + type(input_model).__name__ + "' and '"
+                      + type(output_model).__name__ + "'")
+                return False
+
+        return True
+
+    def compile(self, outputs=None, reuse_buffers=False):
+        """ Build the execution plan of the model chain, done on first use and reused by every run.
+
+            Every model is checked to get its inputs from the previous one. Adjacent models are
+            fused into one stage when the first model supports it (see Model.fuse). Going backwards
+            from outputs, the keys of the final output (all by default), every stage is told which
+            of its output keys are consumed downstream (Model.outputs) and may skip the others.
+
+            With reuse_buffers fused stages may return buffers overwritten by the next branch (e.g.
+            FusedOutput), outputs of stream() must then be consumed or copied before the next one """
+        stages = []
+        for model in self.models:
+            fused = stages[-1].fuse(model, reuse_buffers) if stages else None
+            if fused is not None:
+                stages[-1] = fused
+            else:
+                stages.append(model)
+
+        for input_model, output_model in zip(stages, stages[1:]):
+            if not self.is_compatible(input_model, output_model):
+                raise ValueError("'" + type(output_model).__name__ + "' cannot take the output of '"
+                                 + type(input_model).__name__ + "'")
+
+        needed = [frozenset(outputs if outputs is not None else stages[-1].output_tuple)]
+        for model in reversed(stages[1:]):
+            needed.insert(0, frozenset(model.required_inputs(needed[0])))
+
+        self.stages = stages
+        self.outputs = needed
+        return self
+
+    def _plan(self):
+        """ Compiled stages, with their consumed outputs set since models can be shared by simulations """
+        if self.stages is None:
+            self.compile()
+        for model, outputs in zip(self.stages, self.outputs):
+            model.outputs = outputs
+        return self.stages
+
+    def combinations(self):
+        """ Arguments of every branch of the sweep, one per stage, in the order of process output """
+        return itertools.product(*(model.args_list for model in self._plan()))
+
+    def run_stage(self, index, input_data, args, input_key):
+        model = self.stages[index]
+        key = None
+        if model.cacheable and not model.stateful and (index == 0 or input_key is not None):
+            key = self.cache.key(model, args, input_key)
+        instrument = self.instrument
+        if instrument is not None:
+            instrument.stage_start(model, None)
+            start = time.perf_counter()
+
+        output_data = self.cache.get(key)
+        cached = output_data is not None
+        if not cached:
+            output_data = model.process(input_data, args)
+            '''Final outputs are consumed by the caller and never reused by other branches, they are
+               not kept in memory, so streamed frames are not pinned by the cache and stay writeable'''
+            self.cache.put(key, output_data, keep=index < len(self.stages) - 1)
+
+        if instrument is not None:
+            instrument.stage_stop(model, None, time.perf_counter() - start, input_data, output_data, cached)
+        return output_data, key
+
+    def run_branch(self, combination):
+        """ Execute all stages with the given arguments, one per stage """
+        self._plan()
+        tile_start = self._tile_start()
+        data = None
+        key = None
+        for index, args in enumerate(combination):
+            if index == tile_start:
+                return self._run_tiled(index, data, combination[index:])
+            data, key = self.run_stage(index, data, args, key)
+        return data
+
+    def _tile_start(self):
+        """ Index of the first model of the trailing tileable models, None if tiling is off """
+        if not self.tile_rows:
+            return None
+
+        start = len(self.stages)
+        while start > 0 and self.stages[start - 1].tileable and not self.stages[start - 1].stateful:
+            start -= 1
+        return start if start < len(self.stages) else None
+
+    def _run_tiled(self, index, input_data, combination):
+        models = self.stages[index:]
+        (_, n_rows), _ = next(iter(models[-1].output_tuple.values()))
+
+        def run_tile(rows):
+            '''Every model maps rows of its output to rows of the input it needs, the first tiled
+               model gets the whole input'''
+            rows_list = [rows]
+            for model in reversed(models[1:]):
+                rows_list.insert(0, model.input_rows(rows_list[0]))
+
+            instrument = self.instrument
+            data = input_data
+            for model, args, model_rows in zip(models, combination, rows_list):
+                if instrument is None:
+                    data = model.process_rows(data, args, model_rows)
+                    continue
+
+                instrument.stage_start(model, model_rows)
+                start = time.perf_counter()
+                output_data = model.process_rows(data, args, model_rows)
+                instrument.stage_stop(model, model_rows, time.perf_counter() - start, data, output_data, False)
+                data = output_data
+            return rows, data
+
+        tiles = [np.arange(start, min(start + self.tile_rows, n_rows)) for start in range(0, n_rows, self.tile_rows)]
+        output_data = {}
+        with ThreadPoolExecutor(self.tile_workers) as executor:
+            for rows, data in executor.map(run_tile, tiles):
+                for key, value in data.items():
+                    if key not in output_data:
+                        output_data[key] = np.empty(value.shape[:-2] + (n_rows,) + value.shape[-1:],
+                                                    dtype=value.dtype)
+                    output_data[key][..., rows, :] = value
+        return output_data
+
+    def process(self, path=None):
+        """ Outputs of all branches as a SweepResult, memory-mapped in the path directory if given """
+        result = SweepResult(self._plan(), path)
+        for _, output in self.stream():
+            result.append(output)
+        return result
+
+    def stream(self):
+        """ Yield (combination, output) for every branch as soon as it is finished, branches are
+            yielded in the same order as in process output """
+        self._plan()
+        if self.workers > 1:
+            if any(model.stateful for model in self.stages):
+                raise ValueError("Stateful models cannot be executed in parallel")
+            branches = self._stream_parallel()
+        else:
+            branches = self._stream(0, None, None, ())
+
+        if self.instrument is None:
+            return branches
+        return self._progress(branches)
+
+    def _progress(self, branches):
+        total = 1
+        for model in self.stages:
+            total *= len(model.args_list)
+
+        for done, branch in enumerate(branches, 1):
+            self.instrument.progress(done, total)
+            yield branch
+
+    def _stream(self, index, input_data, input_key, combination):
+        if index >= len(self.stages):
+            yield combination, input_data
+            return
+
+        if index == self._tile_start():
+            for tiled in itertools.product(*(model.args_list for model in self.stages[index:])):
+                yield combination + tiled, self._run_tiled(index, input_data, tiled)
+            return
+
+        for args in self.stages[index].args_list:
+            intermediate_data, key = self.run_stage(index, input_data, args, input_key)
+            yield from self._stream(index + 1, intermediate_data, key, combination + (args,))
+
+    def _stream_parallel(self):
+        count = 1
+        for model in self.stages:
+            count *= len(model.args_list)
+
+        '''Neighbouring branches share upstream stages, send them to the same worker. Number of
+           chunks in flight is limited, so finished outputs do not pile up in memory'''
+        chunksize = max(1, count // (self.workers * 4))
+        combinations = self.combinations()
+
+        with ProcessPoolExecutor(self.workers, initializer=_init_worker,
+                                 initargs=(self.stages, self.outputs, self.cache.empty(), self.tile_rows,
+                                           self.tile_workers)) as executor:
+            pending = deque()
+            while True:
+                chunk = list(itertools.islice(combinations, chunksize))
+                if chunk:
+                    pending.append((chunk, executor.submit(_run_branches, chunk)))
+                if not pending:
+                    return
+                if not chunk or len(pending) >= self.workers * 2:
+                    finished, future = pending.popleft()
+                    yield from zip(finished, future.result())
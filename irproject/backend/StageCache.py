@@ -0,0 +1,75 @@
+import hashlib
+from collections import OrderedDict
+
+import numpy as np
+
+
+def freeze(value):
+    """ Convert stage arguments into a hashable value, raises TypeError if it is not possible """
+    if isinstance(value, dict):
+        return tuple(sorted((key, freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    if isinstance(value, np.ndarray):
+        return value.shape, value.dtype.str, hashlib.sha1(np.ascontiguousarray(value).data).hexdigest()
+    hash(value)
+    return value
+
+
+class StageCache:
+    """ Memoized stage outputs keyed by (stage, consumed outputs, args, upstream key) with LRU eviction.
+
+        Stored arrays are made read-only because the same output is passed to every branch
+        that reuses it. Size of the cache is limited by max_bytes of stored arrays """
+    def __init__(self, max_bytes=2 ** 30):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.entries = OrderedDict()
+
+    def empty(self):
+        """ Cache with the same settings and no entries, used by worker processes """
+        return StageCache(self.max_bytes)
+
+    @staticmethod
+    def key(model, args, upstream_key):
+        """ Key of the stage output, None if args cannot be hashed and output must not be cached """
+        try:
+            return model, model.outputs, freeze(args), upstream_key
+        except TypeError:
+            return None
+
+    @staticmethod
+    def nbytes(output_data):
+        return sum(np.asarray(value).nbytes for value in output_data.values())
+
+    def get(self, key):
+        if key is None or key not in self.entries:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return self.entries[key][0]
+
+    def put(self, key, output_data, keep=True):
+        """ Store the output, with keep unset only in stores outliving the run (see DiskCache) """
+        if key is None or output_data is None or not keep:
+            return
+        nbytes = self.nbytes(output_data)
+        if nbytes > self.max_bytes:
+            return
+
+        for value in output_data.values():
+            if isinstance(value, np.ndarray):
+                value.flags.writeable = False
+
+        self.entries[key] = (output_data, nbytes)
+        self.size += nbytes
+        while self.size > self.max_bytes:
+            _, (_, evicted) = self.entries.popitem(last=False)
+            self.size -= evicted
+
+    def clear(self):
+        self.entries.clear()
+        self.size = 0
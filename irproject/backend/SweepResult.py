@@ -0,0 +1,94 @@
+import itertools
+import os
+
+import numpy as np
+
+
+class SweepResult:
+    def __init__(self, models, path=None):
+        """ Outputs of all branches of a sweep, every output key is stored as one (n_combinations, H, W)
+            array in the order of Simulation.combinations(), or as a memory-mapped .npy file in the
+            path directory for sweeps that do not fit in memory.
+
+            Every model is one axis of the sweep. Its parameter is named by its dict args keys,
+            or by Model.args_name for other args (class name when it is not set) """
+        self.path = path
+        self.shape = tuple(len(model.args_list) for model in models)
+        self.args_lists = [list(model.args_list) for model in models]
+        self.parameters = {}
+        for axis, (model, args_list) in enumerate(zip(models, self.args_lists)):
+            if args_list and all(isinstance(args, dict) for args in args_list):
+                for name in args_list[0]:
+                    self.parameters[name] = (axis, [args.get(name) for args in args_list])
+            else:
+                self.parameters[model.args_name or type(model).__name__] = (axis, args_list)
+        self.data = {}
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, key):
+        """ (n_combinations, H, W) stack of the output key """
+        return self.data[key][:self.count]
+
+    def keys(self):
+        return self.data.keys()
+
+    def combinations(self):
+        return itertools.product(*self.args_lists)
+
+    def append(self, output):
+        """ Store the output of the next branch """
+        for key, value in output.items():
+            if key not in self.data:
+                self.data[key] = self._allocate(key, np.shape(value), np.asarray(value).dtype)
+            self.data[key][self.count] = value
+        self.count += 1
+
+    def _allocate(self, key, shape, dtype):
+        shape = (int(np.prod(self.shape)),) + shape
+        if self.path is None:
+            return np.empty(shape, dtype=dtype)
+        os.makedirs(self.path, exist_ok=True)
+        return np.lib.format.open_memmap(os.path.join(self.path, key + ".npy"), mode="w+", dtype=dtype,
+                                         shape=shape)
+
+    def array(self, key):
+        """ Output key with one axis per model followed by the frame axes """
+        stack = self[key]
+        return stack.reshape(self.shape + stack.shape[1:])
+
+    def values(self, name):
+        """ Values of the named parameter along its axis """
+        return self.parameters[name][1]
+
+    def sel(self, **selection):
+        """ Branches with the given parameter values, e.g. sel(T=300) or sel(T=[300, 350], t_int=slice(None, 1e-4)).
+            A value selects equal values, a list any of its values and a slice the values in its
+            closed range. Returns a SweepResult in memory """
+        positions = [np.arange(size) for size in self.shape]
+        for name, value in selection.items():
+            axis, values = self.parameters[name]
+            if isinstance(value, slice):
+                match = [(value.start is None or item >= value.start) and (value.stop is None or item <= value.stop)
+                         for item in values]
+            elif isinstance(value, (list, tuple)):
+                match = [item in value for item in values]
+            else:
+                match = [item == value for item in values]
+            positions[axis] = positions[axis][np.asarray(match, dtype=bool)[positions[axis]]]
+
+        result = SweepResult.__new__(SweepResult)
+        result.path = None
+        result.shape = tuple(len(position) for position in positions)
+        result.args_lists = [[args_list[index] for index in position]
+                             for args_list, position in zip(self.args_lists, positions)]
+        result.parameters = {name: (axis, [values[index] for index in positions[axis]])
+                             for name, (axis, values) in self.parameters.items()}
+        result.count = int(np.prod(result.shape))
+        result.data = {}
+        for key in self.data:
+            array = self.array(key)[np.ix_(*positions)]
+            result.data[key] = array.reshape((result.count,) + array.shape[len(self.shape):])
+        return result
@@ -0,0 +1,99 @@
+import argparse
+import json
+import sys
+
+from irproject.backend.DiskCache import DiskCache
+from irproject.backend.Exporter import Exporter
+from irproject.backend.Instrument import Progress
+from irproject.backend.Simulation import Simulation
+from irproject.backend.StageCache import StageCache
+from irproject.models.ADC import ADC
+from irproject.models.Blackbody import Blackbody
+from irproject.models.Bolometers import Bolometers
+from irproject.models.NUC import NUC
+from irproject.models.Optics import Optics
+from irproject.models.Readout import Readout
+from irproject.models import params
+
+
+def _tuples(value):
+    """ JSON lists into tuples, parameters of the models are tuples """
+    if isinstance(value, list):
+        return tuple(_tuples(item) for item in value)
+    if isinstance(value, dict):
+        return {key: _tuples(item) for key, item in value.items()}
+    return value
+
+
+def load_config(path):
+    """ Pipeline configuration from a JSON parameter file. Keys, all optional:
+
+        resolution    - active resolution (h, v), params.resolution by default
+        temperatures  - black body temperatures of the sweep
+        calibration   - black body temperatures of the NUC calibration, no NUC when missing
+        models        - keyword arguments of every model by class name (e.g. R1, R2, R3, C of Readout),
+                        params.py values otherwise
+        simulation    - keyword arguments of Simulation (workers, tile_rows, tile_workers)
+        cache         - directory of a DiskCache, stages are reused by later runs with the same directory
+        output        - output file of the ADC frames, see Exporter for the formats """
+    with open(path) as file:
+        return _tuples(json.load(file))
+
+
+def build_models(config):
+    """ Blackbody, Optics, Bolometers, Readout and ADC of the configured resolution """
+    resolution = config.get("resolution", params.resolution)
+    options = config.get("models", {})
+
+    def kwargs(name, **defaults):
+        defaults.update(options.get(name, {}))
+        return defaults
+
+    return [
+        Blackbody(**kwargs("Blackbody")),
+        Optics(**kwargs("Optics", resolution=resolution)),
+        Bolometers(**kwargs("Bolometers", size_active=resolution)),
+        Readout(**kwargs("Readout", size_active=resolution,
+                         adc_resolution=options.get("ADC", {}).get("resolution", params.adc_resolution))),
+        ADC(**kwargs("ADC", size_active=resolution)),
+    ]
+
+
+def run(config, instrument=None):
+    """ Yield (combination, output) of every branch of the configured pipeline """
+    models = build_models(config)
+    cache = DiskCache(config["cache"]) if config.get("cache") else StageCache()
+    simulation_options = config.get("simulation", {})
+
+    if config.get("calibration"):
+        models[0].set_args_list(list(config["calibration"]))
+        coefs, _ = NUC.calibrate(Simulation(models, cache, **simulation_options).stream())
+        nuc_options = dict(config.get("models", {}).get("NUC", {}))
+        nuc_options.setdefault("resolution", config.get("resolution", params.resolution))
+        models.append(NUC(**coefs, **nuc_options))
+
+    models[0].set_args_list(list(config.get("temperatures", (params.T,))))
+    return Simulation(models, cache, instrument=instrument, **simulation_options).stream()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the simulation headlessly from a JSON parameter file")
+    parser.add_argument("config", help="JSON parameter file")
+    parser.add_argument("-o", "--output", help="Output file, overrides the parameter file")
+    parser.add_argument("--workers", type=int, help="Worker processes, overrides the parameter file")
+    parser.add_argument("--progress", action="store_true", help="Report progress on stderr")
+    options = parser.parse_args(argv)
+
+    config = load_config(options.config)
+    if options.workers is not None:
+        config.setdefault("simulation", {})["workers"] = options.workers
+    output = options.output or config.get("output")
+    if output is None:
+        parser.error("No output file given")
+
+    Exporter(output).export(run(config, Progress() if options.progress else None))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
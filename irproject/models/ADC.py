@@ -0,0 +1,96 @@
+import numpy as np
+from irproject.backend.Model import Model
+from irproject.models import params
+
+
+class ADC(Model):
+    def __init__(self, size_active=params.resolution, size_boundary=params.size_boundary, size_blind=params.size_blind,
+                 skim=None, vref=params.V_max, resolution=params.adc_resolution, dtype=params.dtype,
+                 code_dtype=None):
+        """ Codes are produced in code_dtype, same as dtype of the input voltages by default. Integer
+            codes (e.g. uint16 for the fixed-point NUC) are clipped to 0 at the bottom """
+        self.dtype = np.dtype(dtype)
+        self.code_dtype = self.dtype if code_dtype is None else np.dtype(code_dtype)
+        self.vref = vref
+        self.resolution = resolution
+        self.skim = skim
+        self.size_active_h = size_active[0]
+        self.size_active_v = size_active[1]
+        self.size_boundary_t = size_boundary[0]
+        self.size_boundary_b = size_boundary[1]
+        self.size_boundary_l = size_boundary[2]
+        self.size_boundary_r = size_boundary[3]
+        self.size_blind_t = size_blind[0]
+        self.size_blind_b = size_blind[1]
+        self.size_blind_l = size_blind[2]
+        self.size_blind_r = size_blind[3]
+
+        self.size_total_h = self.size_active_h + self.size_boundary_l + self.size_boundary_r \
+                            + self.size_blind_l + self.size_blind_r
+        self.size_total_v = self.size_active_v + self.size_boundary_t + self.size_boundary_b \
+                            + self.size_blind_t + self.size_blind_b
+
+        super().__init__(
+            input_tuple={
+                "V_bol": ((self.size_total_h, self.size_total_v), self.dtype),
+                "V_bol_h": ((self.size_total_h, self.size_total_v), self.dtype),
+                "V_bol_v": ((self.size_total_h, self.size_total_v), self.dtype),
+            },
+            output_tuple={
+                "ADC": ((self.size_active_h, self.size_active_v), self.code_dtype)
+            }
+        )
+
+        self.tileable = True
+
+    def _input_key(self):
+        if self.skim == "h":
+            return "V_bol_h"
+        elif self.skim == "v":
+            return "V_bol_v"
+        else:
+            return "V_bol"
+
+    def _select(self, input_data):
+        return input_data[self._input_key()]
+
+    def required_inputs(self, outputs):
+        return {self._input_key()}
+
+    def fuse(self, model, reuse_buffers=False):
+        """ Quantization and a following NUC are fused into FusedOutput, writing into one reused output
+            buffer with reuse_buffers """
+        from irproject.models.FusedOutput import FusedOutput
+        from irproject.models.NUC import NUC
+
+        if isinstance(model, NUC) and self.args_list == [None] and model.args_list == [None] \
+                and self.output_tuple["ADC"] == model.input_tuple["ADC"]:
+            return FusedOutput(self, model, reuse=reuse_buffers)
+        return None
+
+    def input_rows(self, rows):
+        return rows + self.size_blind_t + self.size_boundary_t
+
+    def process_rows(self, input_data, args, rows):
+        V = self._select(input_data)
+        if V.shape[-2] == self.size_total_v:
+            '''Whole input frame, ADC is the first tiled model'''
+            V = V[..., self.input_rows(rows), :]
+
+        slice_h = slice(self.size_blind_l + self.size_boundary_l, -self.size_boundary_r - self.size_blind_r)
+        return self._convert(V[..., slice_h])
+
+    def process(self, input_data=None, args=None):
+        V = self._select(input_data)
+
+        slice_h = slice(self.size_blind_l + self.size_boundary_l, -self.size_boundary_r - self.size_blind_r)
+        slice_v = slice(self.size_blind_t + self.size_boundary_t, -self.size_boundary_b - self.size_blind_b)
+        return self._convert(V[..., slice_v, slice_h])
+
+    def _convert(self, V_act):
+        adc_max = 2 ** self.resolution - 1
+        V_sat = np.where(V_act < self.vref, V_act, self.vref)
+        V_adc = np.round(V_sat / self.vref * adc_max)
+        if np.issubdtype(self.code_dtype, np.integer):
+            V_adc = np.maximum(V_adc, 0, out=V_adc).astype(self.code_dtype)
+        return {"ADC": V_adc}
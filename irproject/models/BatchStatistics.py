@@ -0,0 +1,46 @@
+import numpy as np
+
+from irproject.backend.Model import Model
+from irproject.models import params
+
+
+class BatchStatistics(Model):
+    def __init__(self, key="ADC", resolution=params.resolution, dtype=params.dtype):
+        """ Per-pixel statistics over the leading batch axis of Monte Carlo realizations, see
+            Bolometers(seeds=...). Follows ADC, or NUC for the residual after correction.
+
+            mean      - mean of the pixel over realizations
+            std       - standard deviation of the pixel over realizations
+            residual  - RMS over realizations of the pixel minus the mean of its frame, the fixed
+                        pattern noise left in the output (NUC residual when following NUC) """
+        self.key = key
+        self.dtype = np.dtype(dtype)
+        self.size_h = resolution[0]
+        self.size_v = resolution[1]
+
+        super().__init__(
+            input_tuple={
+                key: ((self.size_h, self.size_v), self.dtype)
+            },
+            output_tuple={
+                "mean": ((self.size_h, self.size_v), np.dtype(np.float64)),
+                "std": ((self.size_h, self.size_v), np.dtype(np.float64)),
+                "residual": ((self.size_h, self.size_v), np.dtype(np.float64)),
+            }
+        )
+
+    def process(self, input_data=None, args=None):
+        frames = np.asarray(input_data[self.key], dtype=np.float64)
+        '''A single realization is a batch of one'''
+        frames = frames.reshape((-1,) + frames.shape[-2:])
+
+        outputs = self.output_tuple if self.outputs is None else self.outputs
+        output_data = {}
+        if "mean" in outputs:
+            output_data["mean"] = frames.mean(axis=0)
+        if "std" in outputs:
+            output_data["std"] = frames.std(axis=0)
+        if "residual" in outputs:
+            deviation = frames - frames.mean(axis=(1, 2), keepdims=True)
+            output_data["residual"] = np.sqrt(np.mean(deviation ** 2, axis=0))
+        return output_data
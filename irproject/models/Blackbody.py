@@ -0,0 +1,44 @@
+import numpy as np
+
+from irproject.backend.Model import Model
+from irproject.models.Radiance import RadianceTable, band_power
+from irproject.models import params
+
+
+class Blackbody(Model):
+    def __init__(self, T=params.T, lambd=params.lambd, phi=params.phi, area=params.area, omega=params.omega,
+                 n_terms=params.radiance_terms, tol=params.radiance_tol, T_range=None):
+        super().__init__(input_tuple=None, output_tuple={"P": ((1,), np.dtype(np.float64))})
+        self.T = T
+        self.args_name = "T"
+        self.lambd_lower, self.lambd_upper = lambd
+        self.phi_r, self.phi_s = phi
+        self.area = area
+        self.omega = omega
+        self.n_terms = n_terms
+        self.tol = tol
+
+        # Sweeps over a known temperature range can use interpolation table instead of the series
+        self.table = None
+        if T_range is not None:
+            self.table = RadianceTable(T_range, lambd=lambd, phi=phi, area=area, omega=omega,
+                                       n_terms=n_terms, tol=tol)
+
+    def get_power(self, T):
+        """ IR power on one pixel for a temperature or an array of temperatures """
+        if self.table is not None:
+            return self.table(T)
+        return band_power(T, (self.lambd_lower, self.lambd_upper), (self.phi_r, self.phi_s), self.area, self.omega,
+                          self.n_terms, self.tol)
+
+    def process(self, input_data=None, args=None):
+        """ Black body temperature as a parameter, one temperature per branch. Arrays of temperatures
+            are supported by get_power only, sweep them with set_args_list """
+        if args is not None:
+            T = args
+        else:
+            T = self.T
+        if np.ndim(T) != 0:
+            raise ValueError("Blackbody temperature must be a scalar, got shape " + str(np.shape(T)))
+
+        return {"P": self.get_power(T)}
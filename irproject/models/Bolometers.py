@@ -0,0 +1,205 @@
+import hashlib
+import os
+import tempfile
+import threading
+
+import numpy as np
+from irproject.models.constants import k
+
+from irproject.models import params
+from irproject.backend.Model import Model
+from irproject.models.Radiance import band_power
+
+
+class Bolometers(Model):
+    def __init__(self, Tcam=params.Tcam, size_active=params.resolution, size_boundary=params.size_boundary,
+                 size_blind=params.size_blind,
+                 lambd=params.lambd, phi=params.phi, area=params.area, omega=params.omega,
+                 R_ambient_med=params.R_ambient_med, R_ambient_tol=params.R_ambient_tol,
+                 G_thermal_med=params.G_thermal_med, G_thermal_tol=params.G_thermal_tol,
+                 C_thermal_med=params.C_thermal_med, C_thermal_tol=params.C_thermal_tol,
+                 T_ambient=params.T_ambient, TCR=params.TCR, seed=123, seeds=None, maps_dir=None,
+                 dtype=params.dtype):
+
+        self.Tcam = Tcam
+        self.dtype = np.dtype(dtype)
+        self.size_active_h = size_active[0]
+        self.size_active_v = size_active[1]
+        self.size_boundary_t = size_boundary[0]
+        self.size_boundary_b = size_boundary[1]
+        self.size_boundary_l = size_boundary[2]
+        self.size_boundary_r = size_boundary[3]
+        self.size_blind_t = size_blind[0]
+        self.size_blind_b = size_blind[1]
+        self.size_blind_l = size_blind[2]
+        self.size_blind_r = size_blind[3]
+
+        self.lambd_lower = lambd[0]
+        self.lambd_upper = lambd[1]
+        self.phi_r = phi[0]
+        self.phi_s = phi[1]
+        self.area = area
+        self.omega = omega
+
+        self.size_total_h = self.size_active_h + self.size_boundary_l + self.size_boundary_r \
+                            + self.size_blind_l + self.size_blind_r
+        self.size_total_v = self.size_active_v + self.size_boundary_t + self.size_boundary_b \
+                            + self.size_blind_t + self.size_blind_b
+
+        super().__init__(input_tuple={"P_distribution": (size_active, self.dtype)},
+                         output_tuple={"P_total": ((self.size_total_h, self.size_total_v), self.dtype),
+                                       "R_ambient": ((self.size_total_h, self.size_total_v), np.dtype(np.float64)),
+                                       "G_thermal": ((self.size_total_h, self.size_total_v), np.dtype(np.float64)),
+                                       "C_thermal": ((self.size_total_h, self.size_total_v), np.dtype(np.float64)),
+                                       "R0": ((self.size_total_h, self.size_total_v), np.dtype(np.float64)),
+                                       "tau": ((self.size_total_h, self.size_total_v), np.dtype(np.float64))})
+
+        self.R_ambient_med = R_ambient_med
+        self.R_ambient_dev = R_ambient_med * R_ambient_tol
+        self.G_thermal_med = G_thermal_med
+        self.G_thermal_dev = G_thermal_med * G_thermal_tol
+        self.C_thermal_med = C_thermal_med
+        self.C_thermal_dev = C_thermal_med * C_thermal_tol
+        self.T_ambient = T_ambient
+        self.E_activation = -(TCR * k * self.T_ambient ** 2)
+
+        # Monte Carlo mode, maps of every seed are drawn at once and get a leading (K, V, H) batch axis,
+        # map k is the map of Bolometers(seed=seeds[k]). Downstream models propagate the batch axis
+        self.seed = seed
+        self.seeds = None if seeds is None else tuple(seeds)
+
+        # Per-pixel parameter maps are generated once, with maps_dir they are stored in a .npy file
+        # which is memory-mapped by all instances and processes using the same sensor
+        self.maps_dir = maps_dir
+        self._maps = None
+        self._maps_lock = threading.Lock()
+        self.tileable = True
+
+        # Model is parametirized using camera's temperatures, store it into arguments
+        # for caching mechanism
+        super().set_args_list([Tcam])
+        self.args_name = "Tcam"
+
+    def _get_temperature_power_component(self, T):
+        """ IR power emitted by camera body at temperature T, cached per temperature """
+        return band_power(T, (self.lambd_lower, self.lambd_upper), (self.phi_r, self.phi_s), self.area, self.omega)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_maps_lock"]
+        if self.maps_dir is not None:
+            state["_maps"] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._maps_lock = threading.Lock()
+
+    def _seeds(self):
+        return (self.seed,) if self.seeds is None else self.seeds
+
+    def _generate_physical_parameters(self, out):
+        size = (self.size_total_v, self.size_total_h)
+        R_ambient, G_thermal, C_thermal, R0, tau = out
+        for index, seed in enumerate(self._seeds()):
+            rng = np.random.default_rng(seed)
+            batch = (index,) if self.seeds is not None else ()
+            R_ambient[batch] = rng.normal(loc=self.R_ambient_med, scale=self.R_ambient_dev, size=size)
+            G_thermal[batch] = rng.normal(loc=self.G_thermal_med, scale=self.G_thermal_dev, size=size)
+            C_thermal[batch] = rng.normal(loc=self.C_thermal_med, scale=self.C_thermal_dev, size=size)
+
+        tau[:] = C_thermal / G_thermal
+        R0[:] = R_ambient / np.exp(self.E_activation / (k * self.T_ambient))
+
+    def _maps_path(self):
+        config = (self.seed if self.seeds is None else self.seeds, self.size_total_v, self.size_total_h,
+                  self.R_ambient_med, self.R_ambient_dev, self.G_thermal_med, self.G_thermal_dev,
+                  self.C_thermal_med, self.C_thermal_dev,
+                  self.T_ambient, self.E_activation)
+        digest = hashlib.sha1(repr(config).encode()).hexdigest()[:16]
+        return os.path.join(self.maps_dir, "bolometers_" + digest + ".npy")
+
+    def _get_physical_parameters(self):
+        """ R_ambient, G_thermal, C_thermal, R0 and tau maps, they depend only on the seed and
+            tolerances so they are generated once, by the first of the tile threads asking for them """
+        if self._maps is not None:
+            return self._maps
+        with self._maps_lock:
+            if self._maps is None:
+                self._maps = self._load_physical_parameters()
+        return self._maps
+
+    def _load_physical_parameters(self):
+        batch = () if self.seeds is None else (len(self.seeds),)
+        shape = (5,) + batch + (self.size_total_v, self.size_total_h)
+        if self.maps_dir is None:
+            maps = np.empty(shape)
+            self._generate_physical_parameters(maps)
+        else:
+            path = self._maps_path()
+            if not os.path.exists(path):
+                os.makedirs(self.maps_dir, exist_ok=True)
+                descriptor, tmp_path = tempfile.mkstemp(dir=self.maps_dir, suffix=".tmp")
+                os.close(descriptor)
+                try:
+                    maps = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=np.float64, shape=shape)
+                    self._generate_physical_parameters(maps)
+                    maps.flush()
+                    del maps
+                    # Other processes see either no file or a complete one
+                    os.replace(tmp_path, path)
+                except OSError:
+                    '''Maps written by another process in the meantime are the same maps'''
+                    if os.path.exists(tmp_path):
+                        os.remove(tmp_path)
+                    if not os.path.exists(path):
+                        raise
+            maps = np.load(path, mmap_mode="r")
+        return tuple(maps)
+
+    def parameter_ranges(self):
+        """ (min, max) of the R0, G_thermal and tau maps, e.g. for approximate_range of Readout """
+        R_ambient, G_thermal, C_thermal, R0, tau = self._get_physical_parameters()
+        return {name: (float(np.min(value)), float(np.max(value)))
+                for name, value in (("R0", R0), ("G_thermal", G_thermal), ("tau", tau))}
+
+    def process_rows(self, input_data, args, rows):
+        return self._process(input_data, args, rows)
+
+    def process(self, input_data=None, args=None):
+        return self._process(input_data, args, slice(None))
+
+    def _process(self, input_data, args, rows):
+        """ Camera temperatures as a parameter """
+        if args:
+            Tcam = args
+        else:
+            Tcam = self.Tcam
+
+        P_temperature = self._get_temperature_power_component(Tcam)
+        P_active = input_data["P_distribution"]
+
+        rows_total = np.arange(self.size_total_v)[rows]
+        P_pixels = np.zeros((len(rows_total), self.size_total_h), dtype=self.dtype)
+
+        active_start_h = self.size_boundary_l + self.size_blind_l
+        active_stop_h = self.size_total_h - 1 - 1 - self.size_boundary_r + self.size_blind_r
+        active_start_v = self.size_boundary_t + self.size_blind_t
+        active_rows = (rows_total >= active_start_v) & (rows_total < active_start_v + P_active.shape[0])
+        P_pixels[active_rows, active_start_h:active_stop_h] = P_active[rows_total[active_rows] - active_start_v]
+        P_pixels += P_temperature
+        P_total = P_pixels
+
+        R_ambient, G_thermal, C_thermal, R0, tau = self._get_physical_parameters()
+        output_data = {
+            "P_total": P_total,
+            "R_ambient": R_ambient,
+            "G_thermal": G_thermal,
+            "C_thermal": C_thermal,
+            "R0": R0,
+            "tau": tau}
+
+        '''Maps are copied by rows of a tile, only maps consumed downstream are returned'''
+        outputs = self.output_tuple if self.outputs is None else self.outputs
+        return {key: value if key == "P_total" else value[..., rows, :] for key, value in output_data.items()
+                if key in outputs}
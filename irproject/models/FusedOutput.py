@@ -0,0 +1,136 @@
+import numpy as np
+
+from irproject.backend.Model import Model
+
+
+class FusedOutput(Model):
+    def __init__(self, adc, nuc, out=None, block_rows=64, reuse=True):
+        """ ADC quantization and NUC correction fused into one pass over the frame.
+
+            Voltages are converted and corrected by blocks of block_rows rows with in-place operations
+            on preallocated buffers, so no full-frame temporaries are created. Results are written into
+            out, given here or to process, or into a buffer owned by the stage which is reused by every
+            frame, so the output must be consumed (or copied) before the next frame. Without reuse
+            a new output array is allocated for every frame and outputs can be cached. Results are
+            equal to ADC followed by NUC.
+
+            Simulation fuses ADC and NUC into a stage without reuse, compile(reuse_buffers=True) makes
+            it reuse its buffer so that streaming runs allocate no frames in the tail of the pipeline """
+        if adc.output_tuple["ADC"] != nuc.input_tuple["ADC"]:
+            raise ValueError("ADC output does not match NUC input")
+
+        super().__init__(input_tuple=adc.input_tuple, output_tuple=nuc.output_tuple)
+        self.adc = adc
+        self.nuc = nuc
+        self.block_rows = block_rows
+        self.out = out
+        self.reuse = reuse
+        self._scratch = None
+        self._output = None
+
+        # Output buffer is reused, it must not be cached
+        self.cacheable = out is None and not reuse
+        self.tileable = True
+
+    def _get_scratch(self, shape):
+        rows = min(self.block_rows, shape[0])
+        if self._scratch is None or self._scratch[0].shape != (rows, shape[1]):
+            self._scratch = (np.empty((rows, shape[1]), dtype=self.adc.dtype),
+                             np.empty((rows, shape[1]), dtype=np.int32 if self.nuc.fixed_point else self.adc.dtype))
+        return self._scratch
+
+    def _get_output(self, shape):
+        '''Owned output buffer, allocated only for a stage with reuse'''
+        if self._output is None or self._output.shape != shape:
+            self._output = np.empty(shape, dtype=self.nuc.dtype)
+        return self._output
+
+    def required_inputs(self, outputs):
+        return self.adc.required_inputs(outputs)
+
+    def input_rows(self, rows):
+        return self.adc.input_rows(rows)
+
+    def _batched(self, input_data):
+        '''Row blocks are 2D, frames with a batch axis of realizations or batched coefficients are
+           processed by the unfused stages'''
+        return self.adc._select(input_data).ndim > 2 or self.nuc.coef_a.ndim > 2
+
+    def process_rows(self, input_data, args, rows):
+        if self._batched(input_data):
+            return self.nuc.process_rows(self.adc.process_rows(input_data, args, rows), None, rows)
+        V = self._active(input_data)
+        if V.shape[0] == self.adc.size_total_v:
+            '''Whole input frame, the stage is the first tiled model'''
+            V = V[self.input_rows(rows)]
+        rows_block = min(self.block_rows, V.shape[0])
+        scratch = (np.empty((rows_block, V.shape[1]), dtype=self.adc.dtype),
+                   np.empty((rows_block, V.shape[1]), dtype=np.int32 if self.nuc.fixed_point else self.adc.dtype))
+        out = np.empty(V.shape, dtype=self.nuc.dtype)
+        return {"ADC": self._run(V, self._coefs(rows), out, scratch)}
+
+    def process(self, input_data=None, args=None, out=None):
+        if self._batched(input_data):
+            return self.nuc.process(self.adc.process(input_data, args))
+        slice_v = slice(self.adc.size_blind_t + self.adc.size_boundary_t,
+                        -self.adc.size_boundary_b - self.adc.size_blind_b)
+        V = self._active(input_data)[slice_v]
+
+        if out is None and self.out is not None:
+            out = self.out
+        elif out is None:
+            out = self._get_output(V.shape) if self.reuse else np.empty(V.shape, dtype=self.nuc.dtype)
+        return {"ADC": self._run(V, self._coefs(slice(None)), out, self._get_scratch(V.shape))}
+
+    def _active(self, input_data):
+        slice_h = slice(self.adc.size_blind_l + self.adc.size_boundary_l,
+                        -self.adc.size_boundary_r - self.adc.size_blind_r)
+        return self.adc._select(input_data)[:, slice_h]
+
+    def _coefs(self, rows):
+        nuc = self.nuc
+        return (nuc.coef_a[rows], nuc.coef_b[rows], None if nuc.coef_c is None else nuc.coef_c[rows])
+
+    def _run(self, V, coefs, out, scratch):
+        adc = self.adc
+        nuc = self.nuc
+        adc_max = 2 ** adc.resolution - 1
+        nuc_max = 2 ** nuc.adc_resolution - 1
+        integer_codes = np.issubdtype(adc.code_dtype, np.integer)
+        coef_a, coef_b, coef_c = coefs
+
+        for start in range(0, V.shape[0], self.block_rows):
+            block = slice(start, min(start + self.block_rows, V.shape[0]))
+            n = block.stop - block.start
+            codes = scratch[0][:n]
+            target = out[block]
+
+            '''ADC: saturate at the reference voltage and quantize'''
+            np.minimum(V[block], adc.vref, out=codes)
+            codes /= adc.vref
+            codes *= adc_max
+            np.round(codes, out=codes)
+            if integer_codes:
+                np.maximum(codes, 0, out=codes)
+
+            '''NUC: multiply-add and saturate'''
+            if nuc.fixed_point:
+                acc = scratch[1][:n]
+                np.copyto(acc, codes, casting="unsafe")
+                acc *= coef_a[block]
+                acc += coef_b[block]
+                if nuc.fpart_width:
+                    acc += 1 << (nuc.fpart_width - 1)
+                    acc >>= nuc.fpart_width
+                np.clip(acc, 0, nuc_max, out=target, casting="unsafe")
+            else:
+                if coef_c is not None:
+                    square = scratch[1][:n]
+                    np.multiply(codes, codes, out=square)
+                    square *= coef_c[block]
+                np.multiply(codes, coef_a[block], out=target)
+                target += coef_b[block]
+                if coef_c is not None:
+                    target += square
+                np.minimum(target, nuc_max, out=target)
+        return out
@@ -0,0 +1,190 @@
+import numpy as np
+
+from irproject.backend.Model import Model
+from irproject.backend.SweepResult import SweepResult
+from irproject.models import params
+
+
+class NUC(Model):
+    def __init__(self, coef_a, coef_b, coef_c=None, resolution=params.resolution,
+                 adc_resolution=params.adc_resolution, visualize=False, dtype=params.dtype,
+                 fixed_point=False, fpart_width=params.nuc_fpart):
+        """ Correction is coef_a * ADC + coef_b, plus coef_c * ADC ** 2 for a quadratic calibration.
+
+            With fixed_point the linear correction is applied as in hardware: coefficients are stored as
+            int16 (int32 if they do not fit) with fpart_width fractional bits, uint16 ADC codes are
+            multiplied and added in int32, rounded half up by the shift and clipped to the ADC range.
+            Result is written in place into the input frame when it is writeable """
+        self.dtype = np.dtype(np.uint16) if fixed_point else np.dtype(dtype)
+        self.size_h = resolution[0]
+        self.size_v = resolution[1]
+        self.adc_resolution = adc_resolution
+        self.fixed_point = fixed_point
+        self.fpart_width = fpart_width
+
+        if fixed_point:
+            if coef_c is not None:
+                raise ValueError("Fixed-point NUC supports linear correction only")
+            self.coef_a = self._quantize(coef_a, fpart_width)
+            self.coef_b = self._quantize(coef_b, fpart_width)
+            self.coef_c = None
+        else:
+            self.coef_a = np.asarray(coef_a, dtype=self.dtype)
+            self.coef_b = np.asarray(coef_b, dtype=self.dtype)
+            self.coef_c = None if coef_c is None else np.asarray(coef_c, dtype=self.dtype)
+
+        super().__init__(
+            input_tuple={
+                "ADC": ((self.size_h, self.size_v), self.dtype)
+            },
+            output_tuple={
+                "ADC": ((self.size_h, self.size_v), self.dtype)
+            }
+        )
+        self.tileable = True
+
+    @staticmethod
+    def calculate_coefs(frames, temps, fpart_width=params.nuc_fpart):
+        frame0 = frames[0]
+        frame1 = frames[1]
+        temp0 = temps[0]
+        temp1 = temps[1]
+        nuc_a = (temp0 - temp1) / (frame0 - frame1)
+        nuc_b = (temp1 * frame0 - temp0 * frame1) / (frame0 - frame1)
+        if fpart_width:
+            step = 2 ** -fpart_width
+            nuc_a = np.round(nuc_a / step) * step
+            nuc_b = np.round(nuc_b / step) * step
+        return nuc_a, nuc_b
+
+    @staticmethod
+    def stack_frames(frames, key="ADC"):
+        """ (N, H, W) stack from an array, a SweepResult, a list of frames or items of Simulation.stream() """
+        if isinstance(frames, np.ndarray):
+            return frames
+        if isinstance(frames, SweepResult):
+            return frames[key]
+
+        stack = []
+        for frame in frames:
+            if isinstance(frame, tuple):
+                _, frame = frame
+            if isinstance(frame, dict):
+                frame = frame[key]
+            stack.append(frame)
+        return np.stack(stack)
+
+    @staticmethod
+    def calibrate(frames, temps=None, order=1, fpart_width=params.nuc_fpart, bad_sigma=params.nuc_bad_sigma):
+        """ Per-pixel least squares fit of the correction over N frames, linear or quadratic (order=2).
+
+            frames are a (N, H, W) stack, a list of frames or Simulation.stream() of the calibration sweep,
+            temps are N reference values, mean of every frame by default. Frames with a batch axis
+            (N, K, H, W) give (K, H, W) coefficients of every realization. Returns coefficients as keyword
+            arguments of NUC and a mask of bad pixels: pixels with (nearly) constant response or fewer
+            distinct codes than coefficients, pixels whose gain is more than bad_sigma robust deviations
+            off the median and pixels whose fit residual is more than bad_sigma deviations above it. Bad
+            pixels get median coefficients of good pixels """
+        frames = NUC.stack_frames(frames).astype(np.float64)
+        n_frames = frames.shape[0]
+        temps = frames.mean(axis=(-2, -1)) if temps is None else np.asarray(temps, dtype=np.float64)
+        temps = temps.reshape(temps.shape + (1,) * (frames.ndim - temps.ndim))
+        if n_frames <= order:
+            raise ValueError("At least " + str(order + 1) + " frames are needed for order " + str(order))
+
+        '''Fit against normalized codes u = (x - mean) / std to keep normal equations well conditioned'''
+        x_mean = frames.mean(axis=0)
+        x_std = frames.std(axis=0)
+        flat = x_std <= 1e-9 * np.maximum(np.abs(x_mean), 1)
+        x_std = np.where(flat, 1, x_std)
+        '''Pixels with at most order distinct codes (e.g. saturated in all but one frame) give
+           singular normal equations'''
+        distinct = 1 + np.count_nonzero(np.diff(np.sort(frames, axis=0), axis=0), axis=0)
+        degenerate = flat | (distinct <= order)
+        u = (frames - x_mean) / x_std
+
+        powers = np.arange(order + 1)
+        U = u[..., np.newaxis] ** powers
+        A = np.einsum('n...i,n...j->...ij', U, U)
+        B = np.einsum('n...i,n...->...i', U, np.broadcast_to(temps, frames.shape))
+        A[degenerate] = np.eye(order + 1)
+        beta = np.linalg.solve(A, B[..., np.newaxis])[..., 0]
+        residual = np.sqrt(np.mean((np.einsum('n...i,...i->n...', U, beta) - temps) ** 2, axis=0))
+
+        '''Back to coefficients of x'''
+        nuc_a = beta[..., 1] / x_std
+        nuc_b = beta[..., 0] - beta[..., 1] * x_mean / x_std
+        nuc_c = None
+        if order == 2:
+            nuc_c = beta[..., 2] / x_std ** 2
+            nuc_a = nuc_a - 2 * beta[..., 2] * x_mean / x_std ** 2
+            nuc_b = nuc_b + beta[..., 2] * x_mean ** 2 / x_std ** 2
+
+        def outliers(values, two_sided=True):
+            '''Median absolute deviation is zero when most values are equal (quantized codes), standard
+               deviation is used then'''
+            median = np.median(values[~bad])
+            deviation = 1.4826 * np.median(np.abs(values[~bad] - median)) or np.std(values[~bad])
+            distance = np.abs(values - median) if two_sided else values - median
+            return distance > bad_sigma * deviation
+
+        bad = degenerate | ~np.isfinite(nuc_a) | ~np.isfinite(nuc_b)
+        bad |= outliers(nuc_a)
+        if n_frames > order + 1:
+            '''Only a poor fit is bad, residuals below the median are pixels fitting better'''
+            bad |= outliers(residual, two_sided=False)
+
+        coefs = {"coef_a": nuc_a, "coef_b": nuc_b, "coef_c": nuc_c}
+        for name, coef in coefs.items():
+            if coef is None:
+                continue
+            coef[bad] = np.median(coef[~bad]) if np.any(~bad) else 0
+            if fpart_width:
+                step = 2 ** -fpart_width
+                coefs[name] = np.round(coef / step) * step
+        return coefs, bad
+
+    @staticmethod
+    def _quantize(coef, fpart_width):
+        """ Q-format integer coefficients, packed into int16 when the values allow """
+        coef_q = np.round(np.asarray(coef, dtype=np.float64) * 2 ** fpart_width)
+        int16 = np.iinfo(np.int16)
+        if coef_q.min() >= int16.min and coef_q.max() <= int16.max:
+            return coef_q.astype(np.int16)
+        return coef_q.astype(np.int32)
+
+    def process_rows(self, input_data, args, rows):
+        adc = input_data['ADC']
+        if adc.shape[-2] != len(rows):
+            '''Whole input frame, NUC is the first tiled model'''
+            adc = adc[..., rows, :]
+        return self._correct(adc, self.coef_a[..., rows, :], self.coef_b[..., rows, :],
+                             None if self.coef_c is None else self.coef_c[..., rows, :])
+
+    def process(self, input_data=None, args=None):
+        return self._correct(input_data['ADC'], self.coef_a, self.coef_b, self.coef_c)
+
+    def _correct(self, adc, coef_a, coef_b, coef_c):
+        if self.fixed_point:
+            return self._correct_fixed(adc, coef_a, coef_b)
+
+        corr = adc * coef_a + coef_b
+        if coef_c is not None:
+            corr += adc * adc * coef_c
+        adc_max = 2 ** self.adc_resolution - 1
+        corr_sat = np.where(corr < adc_max, corr, adc_max)
+        return {"ADC": corr_sat}
+
+    def _correct_fixed(self, adc, coef_a, coef_b):
+        acc = np.multiply(adc, coef_a, dtype=np.int32)
+        acc += coef_b
+        if self.fpart_width:
+            acc += 1 << (self.fpart_width - 1)
+            acc >>= self.fpart_width
+
+        adc_max = 2 ** self.adc_resolution - 1
+        in_place = isinstance(adc, np.ndarray) and adc.dtype == np.uint16 and adc.flags.writeable \
+                   and adc.shape == acc.shape
+        out = adc if in_place else np.empty(acc.shape, dtype=np.uint16)
+        np.clip(acc, 0, adc_max, out=out, casting="unsafe")
+        return {"ADC": out}
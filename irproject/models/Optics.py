@@ -0,0 +1,44 @@
+from functools import lru_cache
+
+import numpy as np
+
+from irproject.backend.Model import Model
+from irproject.models import params
+
+
+@lru_cache(maxsize=8)
+def distribution_factor(resolution, focal_length, pitch, dtype=np.dtype(params.dtype)):
+    """ IR power distribution factor (cos^4 law) of each pixel, depends only on the sensor geometry
+        so it is calculated once per geometry. Returned array is read-only since it is shared """
+    pixsize_h, pixsize_v = resolution
+
+    ''' Distance of pixel centers from the optical axis, sensor center is between pixels'''
+    row = (np.arange(pixsize_v) + 0.5 - pixsize_v / 2) * pitch
+    col = (np.arange(pixsize_h) + 0.5 - pixsize_h / 2) * pitch
+
+    distrib_fact = (focal_length ** 2 / (row[:, np.newaxis] ** 2 + col[np.newaxis, :] ** 2 + focal_length ** 2)) ** 2
+    distrib_fact = distrib_fact.astype(dtype)
+    distrib_fact.flags.writeable = False
+    return distrib_fact
+
+
+class Optics(Model):
+    def __init__(self, resolution=params.resolution, focal_length=params.focal_length, pitch=params.pitch,
+                 per_pixel=False, dtype=params.dtype):
+        """ Power on the optical axis is a scalar P, or a per-pixel map when per_pixel is set (Scene) """
+        self.dtype = np.dtype(dtype)
+        super().__init__(input_tuple={"P": (resolution, self.dtype) if per_pixel else ((1,), np.dtype(np.float64))},
+                         output_tuple={"P_distribution": (resolution, self.dtype)})
+        self.pixsize_h, self.pixsize_v = resolution
+        self.focal_length = focal_length
+        self.pitch = pitch
+
+    def process(self, input_data=None, args=None):
+        if input_data == None:
+            raise ValueError("Input data cannot be None")
+
+        distrib_fact = distribution_factor((self.pixsize_h, self.pixsize_v), self.focal_length, self.pitch,
+                                           self.dtype)
+
+        ''' Calculating IR power distribution over sensor area '''
+        return {"P_distribution": np.multiply(distrib_fact, input_data["P"], dtype=self.dtype)}
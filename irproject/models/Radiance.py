@@ -0,0 +1,92 @@
+from functools import lru_cache
+
+import numpy as np
+from numpy import exp
+from irproject.models.constants import c, h, k
+
+from irproject.models import params
+
+
+def band_radiance(T, lambd_lower, lambd_upper, n_terms=params.radiance_terms, tol=params.radiance_tol):
+    """ Radiance of a black body in the wavelength band, T can be a scalar or an array of temperatures.
+
+        Integration of Planks radiation function in wave length of interest band
+        "BLACKBODY RADIATION FUNCTION" Chang, Rhee 1984. Series terms for all temperatures are
+        evaluated as one (n_terms, n_temps) array, the series is truncated once the remaining terms
+        are below tol relative to the first one """
+    T = np.asarray(T, dtype=float)
+    x1 = (h * c) / (k * T.ravel() * lambd_lower)
+    x2 = (h * c) / (k * T.ravel() * lambd_upper)
+
+    ''' n-th term decays as exp(-n * x), the tail after N terms is below exp(-N * x) / (1 - exp(-x))'''
+    x_min = np.min(np.minimum(x1, x2), initial=np.inf)
+    n_needed = np.ceil((-np.log(tol) - np.log(-np.expm1(-x_min))) / x_min)
+    n = np.arange(1, int(np.clip(n_needed, 1, n_terms)) + 1)[:, np.newaxis]
+
+    def series(x):
+        return np.sum(exp(-n * x) * (x ** 3 / n + (3 * x ** 2) / n ** 2 + (6 * x) / n ** 3 + 6 / n ** 4), axis=0)
+
+    L = (2 * k ** 4 * T.ravel() ** 4) / (h ** 3 * c ** 2) * (series(x2) - series(x1))
+    return L.reshape(T.shape)[()]
+
+
+def _band_power(T, lambd, phi, area, omega, n_terms, tol):
+    L = band_radiance(T, lambd[0], lambd[1], n_terms, tol)
+    return L * np.cos(phi[1]) * area * np.cos(phi[0]) * omega
+
+
+@lru_cache(maxsize=params.radiance_cache_size)
+def _cached_band_power(T, lambd, phi, area, omega, n_terms, tol):
+    return _band_power(T, lambd, phi, area, omega, n_terms, tol)
+
+
+def band_power(T, lambd=params.lambd, phi=params.phi, area=params.area, omega=params.omega,
+               n_terms=params.radiance_terms, tol=params.radiance_tol):
+    """ IR power that impinges on one pixel sensitive area if it is located in the center of sensor.
+
+        Results for scalar temperatures are cached by temperature, band and geometry, arrays of
+        temperatures are evaluated directly """
+    if np.ndim(T) == 0:
+        return _cached_band_power(float(T), tuple(lambd), tuple(phi), area, omega, n_terms, tol)
+    return _band_power(T, lambd, phi, area, omega, n_terms, tol)
+
+
+class RadianceTable:
+    """ Precomputed band power over a temperature range, evaluated by linear interpolation.
+
+        Grid is refined until the relative interpolation error at the grid midpoints is below
+        max_error, the achieved error is kept in the error attribute. Temperatures outside of the
+        range are evaluated exactly """
+    def __init__(self, T_range, lambd=params.lambd, phi=params.phi, area=params.area, omega=params.omega,
+                 max_error=params.radiance_table_error, n_points=64, max_points=2 ** 16,
+                 n_terms=params.radiance_terms, tol=params.radiance_tol):
+        self.T_min, self.T_max = T_range
+        self.lambd = tuple(lambd)
+        self.phi = tuple(phi)
+        self.area = area
+        self.omega = omega
+        self.n_terms = n_terms
+        self.tol = tol
+
+        while True:
+            self.T_grid = np.linspace(self.T_min, self.T_max, n_points)
+            self.P_grid = self._exact(self.T_grid)
+
+            T_mid = (self.T_grid[1:] + self.T_grid[:-1]) / 2
+            P_mid = self._exact(T_mid)
+            self.error = np.max(np.abs(np.interp(T_mid, self.T_grid, self.P_grid) - P_mid) / P_mid)
+            if self.error <= max_error or n_points >= max_points:
+                break
+            n_points *= 2
+
+    def _exact(self, T):
+        return _band_power(T, self.lambd, self.phi, self.area, self.omega, self.n_terms, self.tol)
+
+    def __call__(self, T):
+        T = np.asarray(T, dtype=float)
+        P = np.interp(T.ravel(), self.T_grid, self.P_grid)
+
+        outside = (T.ravel() < self.T_min) | (T.ravel() > self.T_max)
+        if np.any(outside):
+            P[outside] = self._exact(T.ravel()[outside])
+        return P.reshape(T.shape)[()]
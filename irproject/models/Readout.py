@@ -0,0 +1,417 @@
+import threading
+
+import numpy as np
+from numpy import exp
+from irproject.models.constants import k
+
+from irproject.backend.Model import Model
+from irproject.models import params
+
+
+def solve_hold_voltage(I_bias, R0, E_act, T_base, S, Q=0.0, V0=0.0, tol=params.solver_tol,
+                       max_iter=params.solver_max_iter):
+    """ Solve hold voltage equation Va = I_bias * R0 * exp(E_act / (k * (T_base + (I_bias * Va + Q) * S)))
+        for all pixels at once.
+
+        Newton iterations are used, the right side is a convex decreasing function of Va, so iterations
+        started below the root converge monotonically. Pixel is excluded from iterations once its step
+        is less than tol relative to the voltage, tol is not taken below the precision of the arrays
+        type. All arguments are broadcast to a common shape and type """
+    dtype = np.result_type(R0, T_base, S, Q, V0)
+    tol = max(tol, 16 * np.finfo(dtype).eps)
+    R0, T_base, S, Q, V0 = np.broadcast_arrays(*(np.asarray(a, dtype=dtype) for a in (R0, T_base, S, Q, V0)))
+    V = np.array(V0).ravel()
+    R0, T_base, S, Q = (np.ravel(a) for a in (R0, T_base, S, Q))
+
+    '''Activation energy in Kelvin keeps intermediate values in range of float32'''
+    T_act = E_act / k
+    idx = np.arange(V.size)
+    Va = V.copy()
+    for _ in range(max_iter):
+        T_bol = T_base + (I_bias * Va + Q) * S
+        V_exp = I_bias * R0 * exp(T_act / T_bol)
+        step = (Va - V_exp) / (1 + V_exp * T_act * I_bias * S / T_bol ** 2)
+        Va = np.maximum(Va - step, 0)
+
+        done = np.abs(step) <= tol * Va
+        V[idx[done]] = Va[done]
+        if done.all():
+            break
+
+        pending = ~done
+        idx = idx[pending]
+        Va, R0, T_base, S, Q = Va[pending], R0[pending], T_base[pending], S[pending], Q[pending]
+    else:
+        V[idx] = Va
+
+    return V.reshape(V0.shape)
+
+
+class HoldVoltageTable:
+    """ Hold voltage is Va = I_bias * R0 * exp(u), where u solves u * (T_base + b + a * exp(u)) = T_act with
+        a = I_bias^2 * R0 * S and b = Q * S, so for a given T_base u is a smooth function of a and b only.
+
+        u is precomputed on a regular (a, b) grid and evaluated by bilinear interpolation. Grid is refined
+        along every axis until the interpolation error of u at midpoints of the grid is below max_error,
+        the achieved error bound is kept in the error attribute. Points outside of the ranges are solved
+        exactly """
+    def __init__(self, E_act, T_base, a_range, b_range, max_error, n_points=8, max_points=2 ** 12):
+        self.E_act = E_act
+        self.T_base = T_base
+        self.a_min, self.a_max = self._widen(a_range)
+        self.b_min, self.b_max = self._widen(b_range)
+
+        n_a = n_b = n_points
+        while True:
+            self.a_grid = np.linspace(self.a_min, self.a_max, n_a)
+            self.b_grid = np.linspace(self.b_min, self.b_max, n_b)
+            self.u_grid = self._exact(self.a_grid[:, np.newaxis], self.b_grid[np.newaxis, :])
+
+            a_mid = (self.a_grid[1:] + self.a_grid[:-1]) / 2
+            b_mid = (self.b_grid[1:] + self.b_grid[:-1]) / 2
+            error_a = np.max(np.abs((self.u_grid[1:, :] + self.u_grid[:-1, :]) / 2
+                                    - self._exact(a_mid[:, np.newaxis], self.b_grid[np.newaxis, :])))
+            error_b = np.max(np.abs((self.u_grid[:, 1:] + self.u_grid[:, :-1]) / 2
+                                    - self._exact(self.a_grid[:, np.newaxis], b_mid[np.newaxis, :])))
+
+            '''Errors along both axes add up at cell centers'''
+            self.error = error_a + error_b
+            refine_a = error_a > max_error / 2 and n_a < max_points
+            refine_b = error_b > max_error / 2 and n_b < max_points
+            if self.error <= max_error or not (refine_a or refine_b):
+                break
+            n_a = n_a * 2 if refine_a else n_a
+            n_b = n_b * 2 if refine_b else n_b
+
+    @staticmethod
+    def _widen(value_range):
+        '''Grid needs a non-empty range'''
+        low, high = value_range
+        margin = max(high - low, 1e-9 * max(abs(low), abs(high), 1e-300))
+        return low - margin / 8, high + margin / 8
+
+    def _exact(self, a, b):
+        a, b = np.broadcast_arrays(a, b)
+        '''With I_bias = R0 = 1 the hold voltage is exp(u) for S = a and Q = b / a'''
+        return np.log(solve_hold_voltage(1.0, 1.0, self.E_act, self.T_base, S=a, Q=b / a, tol=0,
+                                         max_iter=2 * params.solver_max_iter))
+
+    def contains(self, a, b):
+        return self.a_min <= np.min(a) and np.max(a) <= self.a_max \
+            and self.b_min <= np.min(b) and np.max(b) <= self.b_max
+
+    def __call__(self, a, b):
+        """ u of every pixel """
+        a, b = np.broadcast_arrays(a, b)
+        n_a, n_b = self.u_grid.shape
+        f_a = (a - self.a_min) * ((n_a - 1) / (self.a_max - self.a_min))
+        f_b = (b - self.b_min) * ((n_b - 1) / (self.b_max - self.b_min))
+        i_a = np.clip(f_a.astype(np.intp), 0, n_a - 2)
+        i_b = np.clip(f_b.astype(np.intp), 0, n_b - 2)
+        t_a = f_a - i_a
+        t_b = f_b - i_b
+
+        '''Gathers from the flattened grid are faster than 2D indexing'''
+        cell = i_a * n_b + i_b
+        u_grid = self.u_grid.ravel()
+        u_00 = u_grid.take(cell)
+        u_01 = u_grid.take(cell + 1)
+        u_10 = u_grid.take(cell + n_b)
+        u_11 = u_grid.take(cell + n_b + 1)
+        u_0 = u_00 + t_b * (u_01 - u_00)
+        u = u_0 + t_a * (u_10 + t_b * (u_11 - u_10) - u_0)
+
+        outside = (f_a < 0) | (f_a > n_a - 1) | (f_b < 0) | (f_b > n_b - 1)
+        if np.any(outside):
+            u[outside] = self._exact(a[outside], b[outside])
+        return u
+
+
+class Readout(Model):
+    def __init__(self, size_active=params.resolution, size_boundary=params.size_boundary, size_blind=params.size_blind,
+                 I_bias=params.I_bias, E_act=params.E_act, T_amb=params.T_ambient, t_int=params.t_int,
+                 V_max=params.V_max, tol=params.solver_tol, max_iter=params.solver_max_iter, frame_period=None,
+                 dtype=params.dtype, approximate=False, approximate_error=params.readout_table_error,
+                 approximate_range=None, R1=params.R1, R2=params.R2, R3=params.R3, C=params.C,
+                 adc_resolution=params.adc_resolution):
+        """ With approximate set hold voltages are interpolated in a HoldVoltageTable instead of being
+            solved. Tables are built per (T_amb, t_int) over approximate_range, (min, max) ranges of the
+            P_total, R0, G_thermal and tau inputs over the sweep, so they are built once and results do not
+            depend on the order of tiles. Missing ranges are taken from the first frame, a table is grown
+            by at least half of its range when a later frame gets out of it. Error bound of the tables
+            in ADC codes (approximate_error at most) is kept in approximation_error. Sequence mode is
+            always solved exactly """
+        if approximate and frame_period is not None:
+            raise ValueError("Approximate Readout does not support sequence mode")
+
+        self.dtype = np.dtype(dtype)
+        self.size_active_h = size_active[0]
+        self.size_active_v = size_active[1]
+        self.size_boundary_t = size_boundary[0]
+        self.size_boundary_b = size_boundary[1]
+        self.size_boundary_l = size_boundary[2]
+        self.size_boundary_r = size_boundary[3]
+        self.size_blind_t = size_blind[0]
+        self.size_blind_b = size_blind[1]
+        self.size_blind_l = size_blind[2]
+        self.size_blind_r = size_blind[3]
+
+        self.size_total_h = self.size_active_h + self.size_boundary_l + self.size_boundary_r \
+                            + self.size_blind_l + self.size_blind_r
+        self.size_total_v = self.size_active_v + self.size_boundary_t + self.size_boundary_b \
+                            + self.size_blind_t + self.size_blind_b
+
+        self.I_bias = I_bias
+        self.E_act = E_act
+        self.T_amb = T_amb
+        self.t_int = t_int
+        self.V_max = V_max
+        self.tol = tol
+        self.max_iter = max_iter
+        self.approximate = approximate
+        self.approximate_error = approximate_error
+        self.approximation_error = None
+        self.approximate_range = dict(approximate_range or {})
+        self._tables = {}
+        self._tables_lock = threading.Lock()
+
+        super().__init__(
+            input_tuple={
+                "P_total": ((self.size_total_h, self.size_total_v), self.dtype),
+                "R_ambient": ((self.size_total_h, self.size_total_v), np.dtype(np.float64)),
+                "G_thermal": ((self.size_total_h, self.size_total_v), np.dtype(np.float64)),
+                "C_thermal": ((self.size_total_h, self.size_total_v), np.dtype(np.float64)),
+                "R0": ((self.size_total_h, self.size_total_v), np.dtype(np.float64)),
+                "tau": ((self.size_total_h, self.size_total_v), np.dtype(np.float64))},
+            # output_tuple = {"DAC": (self.size_active_h, self.size_active_v)},
+            output_tuple={
+                "V_bol": ((self.size_total_h, self.size_total_v), self.dtype),
+                "V_bol_h": ((self.size_total_h, self.size_total_v), self.dtype),
+                "V_bol_v": ((self.size_total_h, self.size_total_v), self.dtype),
+            })
+
+        self.rows_active = slice(self.size_boundary_t + self.size_blind_t,
+                                 self.size_total_v - self.size_boundary_b - self.size_blind_b)
+        self.cols_active = slice(self.size_boundary_l + self.size_blind_l,
+                                 self.size_total_h - self.size_boundary_r - self.size_blind_r)
+
+        self.rows_blind = np.r_[0:self.size_blind_t, self.size_total_v - self.size_blind_b:self.size_total_v]
+
+        self.mask_active = np.zeros((self.size_total_v, self.size_total_h)).astype(bool)
+        self.mask_boundary = np.zeros((self.size_total_v, self.size_total_h)).astype(bool)
+        self.mask_blind = np.zeros((self.size_total_v, self.size_total_h)).astype(bool)
+
+        self.mask_active[self.rows_active, self.cols_active] = True
+
+        self.mask_blind[0:self.size_blind_t, :] = True
+        self.mask_blind[self.size_total_v - self.size_blind_b:self.size_total_v, :] = True
+        self.mask_blind[:, 0:self.size_blind_l] = True
+        self.mask_blind[:, self.size_total_h - self.size_blind_r:self.size_total_h] = True
+
+        self.mask_boundary = np.logical_not(np.logical_or(self.mask_active, self.mask_blind))
+
+        # RESISTORS ON OP AMP INPUTS (Very model-specific)
+        self.R1 = R1
+        self.R2 = R2
+        self.R3 = R3
+        # GAIN CAPACITOR OF INTEGRATOR
+        self.C = C
+        # Resolution of the following ADC, approximate_error is given in its codes
+        self.adc_resolution = adc_resolution
+
+        # Sequence mode, every process call is the next frame of a video and bolometer temperatures
+        # are carried over from the previous frame
+        self.frame_period = frame_period
+        self.stateful = frame_period is not None
+        self.tileable = True
+        self.reset()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_tables_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._tables_lock = threading.Lock()
+
+    def reset(self):
+        """ Start a new sequence, bolometers are at ambient temperature """
+        self.state_dT = 0.0
+        self.state_V = 0.0
+        self.state_V_skim = 0.0
+
+    def input_rows(self, rows):
+        """ Skimming references of every band need top and bottom blind rows """
+        return np.union1d(rows, self.rows_blind)
+
+    def process_rows(self, input_data, args, rows):
+        rows_in = self.input_rows(rows)
+        output_data = self._process(input_data, args, rows_in)
+        position = np.searchsorted(rows_in, rows)
+        return {key: value[..., position, :] for key, value in output_data.items()}
+
+    def required_inputs(self, outputs):
+        """ Ambient resistance and heat capacity are already in R0 and tau """
+        return {"P_total", "R0", "G_thermal", "tau"}
+
+    def process(self, input_data=None, args=None):
+        return self._process(input_data, args, np.arange(self.size_total_v))
+
+    def _process(self, input_data, args, rows):
+        """ Process input arrays holding the given rows of the frame """
+        T_amb = args['T_amb'] if args and args['T_amb'] else self.T_amb
+        t_int = args['t_int'] if args and args['t_int'] else self.t_int
+
+        '''Signal is a relative change of the hold voltage of the order of bolometer parameters tolerance,
+           so hold voltages are always solved in float64, only skimmed outputs use the dtype'''
+        Q = np.asarray(input_data["P_total"], dtype=np.float64)
+        R0 = np.asarray(input_data["R0"], dtype=np.float64)
+        G = np.asarray(input_data["G_thermal"], dtype=np.float64)
+        tau = np.asarray(input_data["tau"], dtype=np.float64)
+
+        mask_blind = self.mask_blind[rows]
+        '''Parameters may carry a leading batch axis of process variation realizations'''
+        V_int_skim = np.zeros(np.broadcast_shapes(Q.shape, R0.shape))
+
+        '''Calculate output voltage of each pixel at the given bias current. Average temperature
+           rise over integration time is g * (I_bias * Va + Q) / G + (1 - g) * dT0, where dT0 is
+           the temperature rise at the start of integration, zero for a single frame'''
+        g = 1 + (tau / t_int) * (exp(-t_int / tau) - 1)
+        S = g / G
+        '''Blind pixels are not exposed to the scene, they only heat up by bias current'''
+        S_skim = (1 - exp(-t_int / tau[..., mask_blind])) / G[..., mask_blind]
+
+        if self.approximate:
+            V_int = self._interpolate(T_amb, t_int, R0, G, tau, S, Q)
+        else:
+            V_int = solve_hold_voltage(
+                self.I_bias, R0, self.E_act, T_amb + (1 - g) * self.state_dT,
+                S=S, Q=Q, V0=self.state_V, tol=self.tol, max_iter=self.max_iter)
+
+        '''Blind pixels are few and their parameters far from exposed ones, they are always solved'''
+        V_int_skim[..., mask_blind] = solve_hold_voltage(
+            self.I_bias, R0[..., mask_blind], self.E_act, T_amb,
+            S=S_skim, V0=self.state_V_skim, tol=self.tol, max_iter=self.max_iter)
+
+        if self.stateful:
+            self._advance_state(V_int, V_int_skim[..., mask_blind], Q, G, tau, t_int)
+
+        return self._skim(V_int, V_int_skim, rows)
+
+    def _interpolate(self, T_amb, t_int, R0, G, tau, S, Q):
+        """ Hold voltages from the table of T_amb and t_int """
+        a = self.I_bias ** 2 * R0 * S
+        b = Q * S
+        table = self._table(T_amb, t_int, R0, G, tau, S, a, b)
+        return self.I_bias * R0 * exp(table(a, b))
+
+    def _input_range(self, name, value):
+        if name in self.approximate_range:
+            return tuple(self.approximate_range[name])
+        return np.min(value), np.max(value)
+
+    def _table_ranges(self, t_int, R0, G, tau, S, a, b):
+        """ Ranges of a and b covering approximate_range, or the frame for missing inputs, and the
+            largest R0 """
+        R0_range = self._input_range("R0", R0)
+        if all(name in self.approximate_range for name in ("R0", "G_thermal", "tau")):
+            '''g decreases with tau, S = g / G is the largest for the smallest tau and G'''
+            G_min, G_max = self._input_range("G_thermal", G)
+            tau_min, tau_max = self._input_range("tau", tau)
+            g_min = 1 + (tau_max / t_int) * (exp(-t_int / tau_max) - 1)
+            g_max = 1 + (tau_min / t_int) * (exp(-t_int / tau_min) - 1)
+            S_range = (g_min / G_max, g_max / G_min)
+            a_range = (self.I_bias ** 2 * R0_range[0] * S_range[0], self.I_bias ** 2 * R0_range[1] * S_range[1])
+        else:
+            S_range = (np.min(S), np.max(S))
+            a_range = (np.min(a), np.max(a))
+
+        if "P_total" in self.approximate_range:
+            corners = [P * S_value for P in self.approximate_range["P_total"] for S_value in S_range]
+            b_range = (min(corners), max(corners))
+        else:
+            b_range = (np.min(b), np.max(b))
+        return a_range, b_range, R0_range[1]
+
+    def _table(self, T_amb, t_int, R0, G, tau, S, a, b):
+        """ Table of T_amb and t_int containing a and b. Tiles of a frame run in threads, tables are
+            looked up and built under a lock """
+        with self._tables_lock:
+            table = self._tables.get((T_amb, t_int))
+            if table is not None and table.contains(a, b):
+                return table
+
+            a_range, b_range, R0_max = self._table_ranges(t_int, R0, G, tau, S, a, b)
+            if table is not None:
+                '''Grown geometrically, a sweep moving out of the table rebuilds it a few times only'''
+                a_range = self._grow((table.a_min, table.a_max), a_range)
+                b_range = self._grow((table.b_min, table.b_max), b_range)
+
+            '''Error of u is scaled by the largest hold voltage, u is at most T_act / T_amb. Voltage errors of
+               a pixel and of its integrated and skimming references add up in the output'''
+            divider = self.R3 / (self.R2 + self.R3)
+            codes_per_volt = ((1 + divider) / (self.R1 * self.C) + divider) * (2 ** self.adc_resolution - 1) \
+                             / self.V_max
+            V_scale = self.I_bias * R0_max * exp(self.E_act / k / T_amb)
+
+            table = HoldVoltageTable(self.E_act, T_amb, a_range, b_range,
+                                     self.approximate_error / (codes_per_volt * V_scale))
+            self._tables[(T_amb, t_int)] = table
+            self.approximation_error = max(self.approximation_error or 0.0, table.error * codes_per_volt * V_scale)
+            return table
+
+    @staticmethod
+    def _grow(table_range, value_range):
+        """ Union of the ranges, extended by half of it on the sides where values get out of the table """
+        low, high = min(table_range[0], value_range[0]), max(table_range[1], value_range[1])
+        margin = (high - low) / 2
+        return (low - margin if value_range[0] < table_range[0] else low,
+                high + margin if value_range[1] > table_range[1] else high)
+
+    def _advance_state(self, V_int, V_skim, Q, G, tau, t_int):
+        '''Bolometer heats up towards (I_bias * Va + Q) / G during integration and relaxes towards
+           Q / G for the rest of the frame period. Voltages are kept to warm-start the next solve'''
+        dT_bias = (self.I_bias * V_int + Q) / G
+        dT_end = dT_bias + (self.state_dT - dT_bias) * exp(-t_int / tau)
+        dT_idle = Q / G
+        self.state_dT = dT_idle + (dT_end - dT_idle) * exp(-(self.frame_period - t_int) / tau)
+        self.state_V = V_int
+        self.state_V_skim = V_skim
+
+    def _blind_references(self, V, rows):
+        """ Reduce blind strips to reference vectors: per column average of top and bottom strips
+            and per row average of left and right strips """
+        cols_blind = np.r_[0:self.size_blind_l, self.size_total_h - self.size_blind_r:self.size_total_h]
+        return V[..., np.isin(rows, self.rows_blind), :].mean(axis=-2), V[..., cols_blind].mean(axis=-1)
+
+    def _skim(self, V_int, V_int_skim, rows):
+        ref_int_v, ref_int_h = self._blind_references(V_int, rows)
+        ref_skim_v, ref_skim_h = self._blind_references(V_int_skim, rows)
+
+        active = np.flatnonzero((rows >= self.rows_active.start) & (rows < self.rows_active.stop))
+        cols = self.cols_active
+        gain = 1 / (self.R1 * self.C)
+        divider = self.R3 / (self.R2 + self.R3)
+        V_act = V_int[..., active, cols]
+
+        outputs = self.output_tuple if self.outputs is None else self.outputs
+        output_data = {}
+
+        '''Column references come from top and bottom blind rows, row references from left and right
+           blind columns. Only outputs consumed downstream are produced'''
+        if "V_bol" in outputs or "V_bol_v" in outputs:
+            V_bol = np.zeros(V_int.shape, dtype=self.dtype)
+            V_bol[..., active, cols] = gain * (divider * ref_int_v[..., np.newaxis, cols] - V_act)
+            output_data["V_bol"] = V_bol
+        if "V_bol_v" in outputs:
+            V_bol_v = np.zeros(V_int.shape, dtype=self.dtype)
+            V_bol_v[..., active, cols] = V_bol[..., active, cols] + divider * ref_skim_v[..., np.newaxis, cols]
+            output_data["V_bol_v"] = V_bol_v
+        if "V_bol_h" in outputs:
+            V_bol_h = np.zeros(V_int.shape, dtype=self.dtype)
+            V_bol_h[..., active, cols] = gain * (divider * ref_int_h[..., active, np.newaxis] - V_act) \
+                                         + divider * ref_skim_h[..., active, np.newaxis]
+            output_data["V_bol_h"] = V_bol_h
+
+        return {key: output_data[key] for key in outputs}
@@ -0,0 +1,49 @@
+import numpy as np
+
+from irproject.backend.Model import Model
+from irproject.models.Radiance import RadianceTable
+from irproject.models import params
+
+
+class Scene(Model):
+    def __init__(self, T=None, resolution=params.resolution, T_range=params.scene_T_range, lambd=params.lambd,
+                 phi=params.phi, area=params.area, omega=params.omega, max_error=params.radiance_table_error,
+                 dtype=params.dtype):
+        """ Thermal scene source, converts a temperature map of the scene into IR power on every pixel.
+
+            Scene is given by a (v, h) temperature map in Kelvin, or a 16-bit image (array or file name)
+            whose full scale is mapped linearly onto T_range. Power is looked up in a band radiance table
+            built once over T_range """
+        self.dtype = np.dtype(dtype)
+        super().__init__(input_tuple=None, output_tuple={"P": (resolution, self.dtype)})
+        self.T = T
+        self.args_name = "scene"
+        self.size_h, self.size_v = resolution
+        self.T_min, self.T_max = T_range
+        self.table = RadianceTable(T_range, lambd=lambd, phi=phi, area=area, omega=omega, max_error=max_error)
+
+    def get_temperature(self, scene):
+        if isinstance(scene, str):
+            import cv2
+            scene = cv2.imread(scene, cv2.IMREAD_UNCHANGED)
+        scene = np.asarray(scene)
+
+        if scene.shape != (self.size_v, self.size_h):
+            raise ValueError("Scene shape " + str(scene.shape) + " does not match sensor resolution "
+                             + str((self.size_v, self.size_h)))
+
+        if scene.dtype == np.uint16:
+            return self.T_min + scene * ((self.T_max - self.T_min) / np.iinfo(np.uint16).max)
+        return scene.astype(float)
+
+    def process(self, input_data=None, args=None):
+        """ Scene as a parameter """
+        if args is not None:
+            scene = args
+        else:
+            scene = self.T
+
+        if scene is None:
+            raise ValueError("Scene temperature map is not set")
+
+        return {"P": self.table(self.get_temperature(scene)).astype(self.dtype)}
@@ -0,0 +1,11 @@
+# Physical constants, exact SI values equal to scipy.constants. Kept here so that importing the
+# models does not import scipy
+
+# Planck constant
+h = 6.62607015e-34
+
+# Speed of light in vacuum
+c = 299792458.0
+
+# Boltzmann constant
+k = 1.380649e-23
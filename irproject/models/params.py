@@ -0,0 +1,104 @@
+# Black body temperature in Kelvin
+T = 300
+
+# Wavelength range of interest
+lambd = (8e-6, 14e-6)
+
+# Angle of incidence
+phi = (0, 0)
+
+# Receiver's pixel sensitive area
+bol_dim_h = 17e-6
+bol_dim_v = 17e-6
+area = bol_dim_h * bol_dim_v 
+
+# Projected solid angle
+omega = 0.75
+
+
+# Resolution of the sensor's active area
+resolution = (320, 240)
+
+focal_length = 0.02
+
+# Pitch between pixels
+pitch = 17e-6
+
+
+# Camera temperature
+Tcam = 30
+
+# boundary pixels
+size_boundary = (2, 2, 2, 2)
+
+# blind pixels
+size_blind = (1, 1, 1, 1)
+
+# Microbolometer parameters, median and tolerance
+
+# Resistance at ambient temperature
+R_ambient_med = 1e6
+R_ambient_tol = 1e-5
+
+# Thermal conductivity
+G_thermal_med = 1e-7
+G_thermal_tol = 1e-5
+
+# Thermal capacity
+C_thermal_med = 5e-9
+C_thermal_tol = 1e-5
+
+# Ambient temperature
+T_ambient = 300
+
+# Thermal coefficient of resistance
+TCR = -0.03
+
+# Bias current
+I_bias = 50e-6
+
+# Activation energy
+E_act = 3.7277523e-20
+
+# Integration time
+t_int = 10e-3
+
+# ADC maximum voltage
+V_max = 3.2
+
+# ADC components?
+R1 = 200e6
+R2 = 10e3
+R3 = 400e6
+C = 4e-13
+
+adc_resolution = 10
+nuc_fpart = 4
+
+# NUC calibration marks pixels deviating by more robust standard deviations as bad
+nuc_bad_sigma = 5
+
+# Hold voltage solver relative tolerance and iterations limit
+solver_tol = 1e-10
+solver_max_iter = 50
+
+# Maximum error in ADC codes of the approximate Readout (hold voltage interpolation table)
+readout_table_error = 0.1
+
+# Black body radiation series terms limit and truncation tolerance
+radiance_terms = 100
+radiance_tol = 1e-12
+
+# Number of cached band power values and relative error of radiance interpolation tables
+radiance_cache_size = 1024
+radiance_table_error = 1e-6
+
+# Temperature range of scene images, full scale of 16-bit images is mapped onto it
+scene_T_range = (250, 400)
+
+# Floating point type of frames computed by Optics, Scene, Bolometers (P_total), Readout (V_bol outputs),
+# ADC and NUC. Bolometer parameter maps and hold voltages stay float64, pixel signal is a relative change
+# of the order of parameter tolerances (1e-5) which float32 cannot resolve. With float32 ADC codes differ
+# from float64 ones by at most 1 code, only for values close to rounding thresholds, NUC output differs by
+# the ADC difference scaled by the NUC gain plus at most 1 code
+dtype = 'float64'
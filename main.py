@@ -1,19 +1,15 @@
-import sys
-
 import cv2
 import numpy as np
 
-sys.path.append('backend')
-sys.path.append('models')
-
-from Simulation import Simulation
-from Optics     import Optics
-from Bolometers import Bolometers
-from Readout    import Readout
-from ADC        import ADC
-from NUC        import NUC
-from Blackbody import Blackbody
-import params
+from irproject.backend.Simulation import Simulation
+from irproject.backend.DiskCache import DiskCache
+from irproject.models.Optics     import Optics
+from irproject.models.Bolometers import Bolometers
+from irproject.models.Readout    import Readout
+from irproject.models.ADC        import ADC
+from irproject.models.NUC        import NUC
+from irproject.models.Blackbody import Blackbody
+from irproject.models import params
 
 # General parameters
 FOV = np.pi / 6
@@ -59,26 +55,23 @@ adc = ADC(
 temps = [300, 400]
 blackbody.set_args_list(temps)
 
-sim_nuc_coef = Simulation([blackbody, optics, bolometers, readout, adc])
-output_nuc_coef = sim_nuc_coef.process()
-
-frame0 = output_nuc_coef[0][0][0][0][0]['ADC']
-frame1 = output_nuc_coef[1][0][0][0][0]['ADC']
+# Stages shared by both simulations are computed once, and reused by later runs
+cache = DiskCache('./cache')
 
-nuc_a, nuc_b = NUC.calculate_coefs([frame0, frame1], [np.mean(frame0), np.mean(frame1)])
+sim_nuc_coef = Simulation([blackbody, optics, bolometers, readout, adc], cache)
+nuc_coefs, bad_pixels = NUC.calibrate(sim_nuc_coef.stream())
 
 nuc = NUC(
-    coef_a=nuc_a,
-    coef_b=nuc_b,
+    **nuc_coefs,
     resolution=(resolution_h, resolution_v)
 )
 
 # Run silumation with NUC
 blackbody.set_args_list([300])
 
-sim = Simulation([blackbody, optics, bolometers, readout, adc, nuc])
-output = sim.process()
-adc_data = output[0][0][0][0][0][0]['ADC']
+sim = Simulation([blackbody, optics, bolometers, readout, adc, nuc], cache)
+_, output = next(sim.stream())
+adc_data = output['ADC']
 output_normalized = 255.0 * adc_data / (2 ** params.adc_resolution - 1)
 image_data = output_normalized.astype(np.uint8)
 print(image_data)
@@ -0,0 +1,24 @@
+import numpy as np
+import pytest
+
+from irproject.backend.Exporter import Exporter
+
+
+def test_npy_stack_is_readable(tmp_path):
+    path = str(tmp_path / "frames.npy")
+    frames = np.arange(24, dtype=np.float64).reshape(4, 2, 3)
+
+    with Exporter(path) as exporter:
+        for frame in frames:
+            exporter.write(frame)
+
+    np.testing.assert_array_equal(np.load(path), frames)
+
+
+def test_error_of_the_last_chunk_is_raised_by_close(tmp_path):
+    exporter = Exporter(str(tmp_path / "frames.npz"))
+    exporter.write(np.zeros((2, 2)))
+    exporter.write(np.zeros((3, 3)))
+
+    with pytest.raises(ValueError):
+        exporter.close()
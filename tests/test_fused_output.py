@@ -0,0 +1,112 @@
+import tracemalloc
+
+import numpy as np
+import pytest
+
+from irproject.backend.Model import Model
+from irproject.backend.Simulation import Simulation
+from irproject.models.ADC import ADC
+from irproject.models.FusedOutput import FusedOutput
+from irproject.models.NUC import NUC
+
+RESOLUTION = (16, 12)
+SIZE_BOUNDARY = (1, 1, 1, 1)
+SIZE_BLIND = (2, 2, 2, 2)
+
+
+class Source(Model):
+    """ Voltages of the readout, one frame per offset """
+    def __init__(self, input_data):
+        shape = ((RESOLUTION[0] + 6, RESOLUTION[1] + 6), np.dtype(np.float64))
+        super().__init__(output_tuple={"V_bol": shape, "V_bol_h": shape, "V_bol_v": shape}, args_list=[0.0, 0.5, 1.0])
+        self.input_data = input_data
+
+    def process(self, input_data=None, args=None):
+        V = self.input_data["V_bol"] + args
+        return {"V_bol": V, "V_bol_h": V, "V_bol_v": V}
+
+
+def _input(shape=(), resolution=RESOLUTION):
+    rng = np.random.default_rng(0)
+    total = (resolution[1] + 6, resolution[0] + 6)
+    return {"V_bol": rng.uniform(-0.1, 3.5, shape + total)}
+
+
+def _stages(fixed_point, resolution=RESOLUTION):
+    rng = np.random.default_rng(1)
+    coef_a = rng.uniform(0.9, 1.1, resolution[::-1])
+    coef_b = rng.uniform(-10, 10, resolution[::-1])
+    adc = ADC(size_active=resolution, size_boundary=SIZE_BOUNDARY, size_blind=SIZE_BLIND,
+              code_dtype=np.uint16 if fixed_point else None)
+    nuc = NUC(coef_a, coef_b, resolution=resolution, fixed_point=fixed_point)
+    return adc, nuc
+
+
+@pytest.mark.parametrize("fixed_point", [False, True])
+@pytest.mark.parametrize("block_rows", [1, 5, 64])
+def test_fused_output_matches_adc_and_nuc(fixed_point, block_rows):
+    adc, nuc = _stages(fixed_point)
+    input_data = _input()
+    expected = nuc.process(adc.process(input_data))["ADC"]
+
+    fused = FusedOutput(adc, nuc, block_rows=block_rows)
+
+    np.testing.assert_array_equal(fused.process(input_data)["ADC"], expected)
+
+
+@pytest.mark.parametrize("fixed_point", [False, True])
+def test_fused_output_rows_match_whole_frame(fixed_point):
+    adc, nuc = _stages(fixed_point)
+    input_data = _input()
+    expected = nuc.process(adc.process(input_data))["ADC"]
+    fused = FusedOutput(adc, nuc, block_rows=4, reuse=False)
+
+    rows = np.arange(3, 9)
+    output = fused.process_rows(input_data, None, rows)["ADC"]
+
+    np.testing.assert_array_equal(output, expected[rows])
+
+
+def test_fused_output_reuses_its_buffer_only_with_reuse():
+    adc, nuc = _stages(True)
+    input_data = _input()
+
+    fused = FusedOutput(adc, nuc, reuse=False)
+    first = fused.process(input_data)["ADC"]
+    assert fused.process(input_data)["ADC"] is not first
+    assert fused._output is None
+
+    adc, nuc = _stages(True, (320, 240))
+    input_data = _input(resolution=(320, 240))
+    fused = FusedOutput(adc, nuc)
+    first = fused.process(input_data)["ADC"]
+    tracemalloc.start()
+    second = fused.process(input_data)["ADC"]
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert second is first
+    assert peak < first.nbytes / 2
+
+
+def test_compile_reuse_buffers_streams_into_one_buffer():
+    adc, nuc = _stages(False)
+    source = Source(_input())
+    expected = Simulation([source, adc, nuc]).process()["ADC"]
+
+    simulation = Simulation([source, adc, nuc]).compile(reuse_buffers=True)
+    outputs = [output["ADC"] for _, output in simulation.stream()]
+
+    assert isinstance(simulation.stages[-1], FusedOutput) and simulation.stages[-1].reuse
+    assert outputs[0] is outputs[-1]
+    np.testing.assert_array_equal(outputs[-1], expected[-1])
+
+
+def test_fused_output_batch_axis():
+    adc, nuc = _stages(False)
+    input_data = _input((3,))
+    expected = nuc.process(adc.process(input_data))["ADC"]
+
+    output = FusedOutput(adc, nuc).process(input_data)["ADC"]
+
+    assert output.shape == (3,) + RESOLUTION[::-1]
+    np.testing.assert_array_equal(output, expected)
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from irproject.models.NUC import NUC
+
+
+def _frames(temps, gain, offset):
+    """ Integer codes of pixels with a linear response """
+    return np.round((np.asarray(temps)[:, np.newaxis, np.newaxis] - offset) / gain)
+
+
+def test_calibrate_recovers_gain_and_offset():
+    rng = np.random.default_rng(0)
+    gain = rng.uniform(0.9, 1.1, (6, 8))
+    offset = rng.uniform(-20, 20, (6, 8))
+    temps = np.linspace(290, 330, 5)
+    frames = (temps[:, np.newaxis, np.newaxis] - offset) / gain
+
+    coefs, bad = NUC.calibrate(frames, temps, fpart_width=0)
+
+    assert not bad.any()
+    np.testing.assert_allclose(coefs["coef_a"], gain, rtol=1e-9)
+    np.testing.assert_allclose(coefs["coef_b"], offset, atol=1e-6)
+
+
+def test_calibrate_does_not_flag_good_fits():
+    rng = np.random.default_rng(0)
+    gain = rng.normal(1, 0.1, (30, 40))
+    offset = rng.normal(0, 20, (30, 40))
+    temps = np.linspace(290, 330, 5)
+
+    _, bad = NUC.calibrate(_frames(temps, gain, offset), temps)
+
+    assert bad.sum() <= 2
+
+
+@pytest.mark.parametrize("order", [1, 2])
+def test_calibrate_marks_degenerate_pixels_bad(order):
+    temps = np.linspace(290, 330, 6)
+    frames = _frames(temps, np.full((4, 5), 0.04), np.full((4, 5), 250.0))
+    frames[:, 1, 2] = [1009, 1023, 1023, 1023, 1023, 1023]
+    frames[:, 3, 4] = 512
+
+    coefs, bad = NUC.calibrate(frames, temps, order=order)
+
+    if order == 2:
+        assert bad[1, 2]
+    assert bad[3, 4]
+    assert np.isfinite(coefs["coef_a"]).all()
+
+
+def test_correct_applies_coefficients():
+    nuc = NUC(np.full((3, 2), 2.0), np.full((3, 2), 1.0), resolution=(2, 3))
+    adc = np.arange(6, dtype=np.float64).reshape(3, 2)
+
+    np.testing.assert_array_equal(nuc.process({"ADC": adc})["ADC"], adc * 2 + 1)
@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+from irproject.models import params
+from irproject.models.Bolometers import Bolometers
+from irproject.models.Readout import solve_hold_voltage
+from irproject.models.constants import k
+
+
+def _frame():
+    """ Bolometer parameters of a small sensor and a scene power around the black body one """
+    bolometers = Bolometers(size_active=(8, 6), size_boundary=(1, 1, 1, 1), size_blind=(1, 1, 1, 1))
+    _, G, _, R0, tau = bolometers._get_physical_parameters()
+    g = 1 + (tau / params.t_int) * (np.exp(-params.t_int / tau) - 1)
+    Q = np.random.default_rng(0).uniform(0, 2e-8, R0.shape)
+    return np.asarray(R0), g / np.asarray(G), Q
+
+
+def test_solve_hold_voltage_matches_fsolve():
+    optimize = pytest.importorskip("scipy.optimize")
+    R0, S, Q = _frame()
+    T_base = params.T_ambient
+
+    V = solve_hold_voltage(params.I_bias, R0, params.E_act, T_base, S=S, Q=Q)
+
+    def equation(Va, R0, S, Q):
+        return Va - params.I_bias * R0 * np.exp(params.E_act / (k * (T_base + (params.I_bias * Va + Q) * S)))
+
+    expected = np.empty_like(V)
+    for index in np.ndindex(V.shape):
+        expected[index] = optimize.fsolve(equation, 0.0, args=(R0[index], S[index], Q[index]), xtol=1e-13)[0]
+    np.testing.assert_allclose(V, expected, rtol=1e-9)
+
+
+def test_solve_hold_voltage_broadcasts_batch_axis():
+    R0, S, Q = _frame()
+    R0_batch = np.stack([R0, R0 * 1.01])
+
+    V = solve_hold_voltage(params.I_bias, R0_batch, params.E_act, params.T_ambient, S=S, Q=Q)
+
+    assert V.shape == R0_batch.shape
+    np.testing.assert_array_equal(V[0], solve_hold_voltage(params.I_bias, R0, params.E_act, params.T_ambient,
+                                                           S=S, Q=Q))
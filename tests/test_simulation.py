@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+from irproject.backend.Simulation import Simulation
+from irproject.models.ADC import ADC
+from irproject.models.BatchStatistics import BatchStatistics
+from irproject.models.Blackbody import Blackbody
+from irproject.models.Bolometers import Bolometers
+from irproject.models.Optics import Optics
+from irproject.models.Readout import Readout
+
+RESOLUTION = (32, 24)
+
+
+def _models(temps=(300,), maps_dir=None, seeds=None):
+    blackbody = Blackbody()
+    blackbody.set_args_list(list(temps))
+    return [blackbody, Optics(resolution=RESOLUTION),
+            Bolometers(size_active=RESOLUTION, maps_dir=maps_dir, seeds=seeds),
+            Readout(size_active=RESOLUTION), ADC(size_active=RESOLUTION)]
+
+
+def test_tiled_threads_match_whole_frame(tmp_path):
+    expected = Simulation(_models()).process()["ADC"]
+
+    for _ in range(2):
+        output = Simulation(_models(maps_dir=str(tmp_path)), tile_rows=4, tile_workers=8).process()["ADC"]
+        np.testing.assert_array_equal(output, expected)
+    assert [path.suffix for path in tmp_path.iterdir()] == [".npy"]
+
+
+def test_stream_does_not_keep_final_outputs():
+    simulation = Simulation(_models(temps=np.linspace(290, 330, 6)))
+
+    for _, output in simulation.stream():
+        assert output["ADC"].flags.writeable
+    assert all(key[0] is not simulation.stages[-1] for key in simulation.cache.entries)
+
+
+def test_workers_keep_compiled_outputs():
+    def simulation(workers):
+        models = _models(temps=(300, 320), seeds=(1, 2)) + [BatchStatistics(resolution=RESOLUTION)]
+        return Simulation(models, workers=workers).compile(outputs={"mean"})
+
+    serial = simulation(1).process()
+    parallel = simulation(2).process()
+
+    assert list(parallel.keys()) == list(serial.keys()) == ["mean"]
+    np.testing.assert_array_equal(parallel["mean"], serial["mean"])
+
+
+def test_batch_realizations_match_single_seeds():
+    seeds = (1, 2, 3)
+    output = Simulation(_models(seeds=seeds)).process()["ADC"][0]
+
+    for index, seed in enumerate(seeds):
+        models = _models()
+        models[2] = Bolometers(size_active=RESOLUTION, seed=seed)
+        np.testing.assert_array_equal(output[index], Simulation(models).process()["ADC"][0])
+
+
+def test_blackbody_rejects_temperature_arrays():
+    models = _models()
+    models[0].set_args_list([np.linspace(300, 400, RESOLUTION[0])])
+
+    with pytest.raises(ValueError):
+        Simulation(models).process()